@@ -0,0 +1,62 @@
+"""
+Benchmark the two winner-determination paths of AuctionMechanism.determine_winners
+
+The dict path runs the greedy directly on the bids; the packed path packs them into
+arrays first. determine_winners switches to the packed path at auction.packed_min_bids.
+
+Usage: python benchmarks/bench_auction.py [n_bids ...]
+"""
+
+import os
+import random
+import sys
+import timeit
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from core.auction import AuctionMechanism, Bid
+
+RESOURCE_TYPES = ("cpu", "memory", "network")
+
+
+def make_round(n_bids: int, seed: int = 0) -> Tuple[List[Bid], Dict[str, float], Dict[str, float]]:
+    """One oversubscribed auction round: roughly a quarter of the bids fit"""
+    rng = random.Random(seed)
+    n_tenants = max(1, n_bids // 10)
+    bids = [
+        Bid(tenant_id=f"tenant_{rng.randrange(n_tenants)}",
+            resource_bundle={k: rng.uniform(0.5, 4.0) for k in RESOURCE_TYPES},
+            valuation=rng.uniform(1.0, 20.0),
+            timestamp=float(i))
+        for i in range(n_bids)
+    ]
+    available = {k: 0.25 * n_bids * 2.25 for k in RESOURCE_TYPES}
+    balances = {f"tenant_{t}": 1000.0 for t in range(n_tenants)}
+    return bids, available, balances
+
+
+def bench(n_bids: int, repeat: int = 7) -> Tuple[float, float]:
+    """Best-of-repeat seconds per round for the dict path and for the packed path"""
+    bids, available, balances = make_round(n_bids)
+    auction = AuctionMechanism({'packed_min_bids': 0}, resource_keys=RESOURCE_TYPES)
+    auction.warmup()
+    number = max(1, 20000 // n_bids)
+    dict_path = min(timeit.repeat(lambda: auction._determine_winners_dict(bids, available, dict(balances)),
+                                  number=number, repeat=repeat)) / number
+    packed_path = min(timeit.repeat(lambda: auction.determine_winners(bids, available, dict(balances)),
+                                    number=number, repeat=repeat)) / number
+    return dict_path, packed_path
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [6, 100, 1000, 3000, 10000]
+    print(f"{'bids':>8} {'dict path':>12} {'packed path':>12} {'speedup':>8}")
+    for n_bids in sizes:
+        dict_path, packed_path = bench(n_bids)
+        print(f"{n_bids:>8} {dict_path * 1e6:>10.1f}us {packed_path * 1e6:>10.1f}us "
+              f"{dict_path / packed_path:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark the two allocation paths of the baseline schedulers
+
+The loop path allocates resource by resource on the requirement dicts; the matrix
+path packs requirements into a (tenants x resources) matrix first.
+VectorizedBaseline switches to the matrix path at matrix_min_resources.
+
+Usage: python benchmarks/bench_baselines.py
+"""
+
+import os
+import random
+import sys
+import timeit
+from typing import Dict, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from core.baselines import CAPSysBaseline, FlinkDefaultBaseline
+
+
+def make_round(n_tenants: int, n_resources: int,
+               seed: int = 0) -> Tuple[Dict[str, Dict[str, float]], Dict[str, float]]:
+    """One scheduling round in which every tenant requests every resource"""
+    rng = random.Random(seed)
+    resource_types = [f"resource_{j}" for j in range(n_resources)]
+    requirements = {f"tenant_{t}": {k: rng.uniform(0.0, 20.0) for k in resource_types}
+                    for t in range(n_tenants)}
+    available = {k: 5.0 * n_tenants for k in resource_types}
+    return requirements, available
+
+
+def bench(cls, n_tenants: int, n_resources: int, repeat: int = 7) -> Tuple[float, float]:
+    """Best-of-repeat seconds per round on the loop path and on the matrix path"""
+    requirements, available = make_round(n_tenants, n_resources)
+    times = []
+    for matrix_min_resources in (n_resources + 1, 0):
+        baseline = cls({})
+        for tenant_id in requirements:
+            baseline.initialize_tenant(tenant_id)
+        baseline.matrix_min_resources = matrix_min_resources
+        number = max(1, 20000 // (n_tenants * n_resources))
+        times.append(min(timeit.repeat(lambda: baseline.run_scheduling_round(requirements, available),
+                                       number=number, repeat=repeat)) / number)
+    return times[0], times[1]
+
+
+def main():
+    print(f"{'baseline':>14} {'tenants':>8} {'resources':>10} {'loop':>10} {'matrix':>10} {'speedup':>8}")
+    for cls in (FlinkDefaultBaseline, CAPSysBaseline):
+        for n_tenants in (3, 20, 200):
+            for n_resources in (3, 8, 16, 32, 64):
+                loop, matrix = bench(cls, n_tenants, n_resources)
+                print(f"{cls.__name__[:-8]:>14} {n_tenants:>8} {n_resources:>10} {loop * 1e6:>8.1f}us "
+                      f"{matrix * 1e6:>8.1f}us {loop / matrix:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compiled kernels for the StreamBazaar auction mechanism
+"""
+
+import operator
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to the interpreted kernels
+    njit = None
+
+
+def _greedy_select(R: np.ndarray, v: np.ndarray, tenant_idx: np.ndarray,
+                   remaining: np.ndarray, balances: np.ndarray, order: np.ndarray):
+    """
+    Greedy winner selection over bids packed as Structure-of-Arrays
+
+    Args:
+        R: Resource bundle matrix (n_bids, n_resources)
+        v: Bid valuations (n_bids,)
+        tenant_idx: Dense tenant index of each bid (n_bids,)
+        remaining: Available resources (n_resources,), updated in place
+        balances: Tenant balances (n_tenants,), updated in place
+        order: Bid indices in the order they should be considered
+
+    Returns:
+        Tuple: (winner_mask, remaining, balances)
+    """
+    n_resources = R.shape[1]
+    winner_mask = np.zeros(R.shape[0], dtype=np.bool_)
+
+    for idx in range(order.shape[0]):
+        i = order[idx]
+        t = tenant_idx[i]
+        # Check if tenant has enough balance
+        if balances[t] < v[i]:
+            continue
+
+        # Check if resources are available; branchless so the compiler can vectorize it
+        feasible = True
+        for j in range(n_resources):
+            feasible &= R[i, j] <= remaining[j]
+
+        if feasible:
+            for j in range(n_resources):
+                remaining[j] -= R[i, j]
+            balances[t] -= v[i]
+            winner_mask[i] = True
+
+    return winner_mask, remaining, balances
+
+
+def _greedy_select_numpy(R: np.ndarray, v: np.ndarray, tenant_idx: np.ndarray,
+                         remaining: np.ndarray, balances: np.ndarray, order: np.ndarray):
+    """Interpreted variant of _greedy_select; scans Python lists instead of indexing arrays per element"""
+    rows = R.tolist()
+    valuations = v.tolist()
+    tenants = tenant_idx.tolist()
+    tenant_balances = balances.tolist()
+    remaining_list = remaining.tolist()
+    winner_mask = np.zeros(R.shape[0], dtype=np.bool_)
+
+    for i in order.tolist():
+        t = tenants[i]
+        if tenant_balances[t] < valuations[i]:
+            continue
+
+        if all(map(operator.le, rows[i], remaining_list)):
+            # Subtract in the array's own dtype so rounding matches the compiled kernel
+            remaining -= R[i]
+            remaining_list = remaining.tolist()
+            tenant_balances[t] -= valuations[i]
+            winner_mask[i] = True
+
+    balances[:] = tenant_balances
+    return winner_mask, remaining, balances
+
+
+if njit is not None:
+    _greedy_select = njit(cache=True, fastmath=True)(_greedy_select)
+else:
+    _greedy_select = _greedy_select_numpy
@@ -2,22 +2,35 @@
 Continuous double auction mechanism for StreamBazaar
 """
 
+import math
 import numpy as np
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple, Optional, Sequence, Union
+from dataclasses import dataclass, field
 from core.devices import Device
+from core._auction_kernels import _greedy_select
 
+# Resource amounts in the packed bid matrix; single precision is ample for resource
+# counts and halves the memory traffic of the feasibility checks. Packed auctions
+# compare amounts after rounding to float32, so a bundle that exceeds the remaining
+# capacity by less than float32 resolution still fits.
+RESOURCE_DTYPE = np.float32
 
-@dataclass
+
+@dataclass(slots=True)
 class Bid:
     """Represents a bid from a tenant for resources"""
     tenant_id: str
     resource_bundle: Dict[str, float]  # {resource_type: amount}
     valuation: float  # How much the tenant values this bundle
     timestamp: float
+    total_resources: Optional[float] = None  # sum(resource_bundle.values()), computed if omitted
+    
+    def __post_init__(self):
+        if self.total_resources is None:
+            self.total_resources = sum(self.resource_bundle.values())
 
 
-@dataclass
+@dataclass(slots=True)
 class Allocation:
     """Represents an allocation of resources to a tenant"""
     tenant_id: str
@@ -26,15 +39,110 @@ class Allocation:
     timestamp: float
 
 
+@dataclass
+class BidBatch:
+    """Bids of one auction round stored as Structure-of-Arrays"""
+    tenant_ids: np.ndarray  # object (n_bids,)
+    valuations: np.ndarray  # float64 (n_bids,)
+    resources: Dict[str, np.ndarray]  # {resource_type: amounts (n_bids,)}, 0 where not requested
+    timestamps: np.ndarray  # float64 (n_bids,)
+    # {resource_type: bool (n_bids,)}, whether each bid requested the resource; None if all did
+    requested: Optional[Dict[str, np.ndarray]] = None
+    
+    def __len__(self) -> int:
+        return len(self.valuations)
+    
+    def bundle(self, i: int) -> Dict[str, float]:
+        """Resource bundle of bid i, with only the resources it requested"""
+        if self.requested is None:
+            return {resource_type: float(amounts[i]) for resource_type, amounts in self.resources.items()}
+        requested = self.requested
+        return {resource_type: float(amounts[i]) for resource_type, amounts in self.resources.items()
+                if requested[resource_type][i]}
+    
+    @classmethod
+    def from_bids(cls, bids: Iterable[Bid]) -> "BidBatch":
+        """Pack Bid objects into a batch"""
+        builder = cls.Builder()
+        for bid in bids:
+            builder.append(bid)
+        return builder.build()
+    
+    @dataclass
+    class Builder:
+        """Accumulates bids column by column"""
+        tenant_ids: List[str] = field(default_factory=list)
+        valuations: List[float] = field(default_factory=list)
+        resources: Dict[str, List[float]] = field(default_factory=dict)
+        timestamps: List[float] = field(default_factory=list)
+        requested: Dict[str, List[bool]] = field(default_factory=dict)
+        
+        def append(self, bid: Bid):
+            """Add a bid, zero-filling the resource columns it does not request"""
+            n = len(self.tenant_ids)
+            for resource_type, amount in bid.resource_bundle.items():
+                amounts = self.resources.get(resource_type)
+                if amounts is None:
+                    amounts = self.resources[resource_type] = [0.0] * n
+                    self.requested[resource_type] = [False] * n
+                amounts.append(amount)
+                self.requested[resource_type].append(True)
+            for resource_type, amounts in self.resources.items():
+                if len(amounts) == n:
+                    amounts.append(0.0)
+                    self.requested[resource_type].append(False)
+            self.tenant_ids.append(bid.tenant_id)
+            self.valuations.append(bid.valuation)
+            self.timestamps.append(bid.timestamp)
+        
+        def build(self) -> "BidBatch":
+            """Freeze the accumulated bids into a BidBatch"""
+            return BidBatch(
+                tenant_ids=np.array(self.tenant_ids, dtype=object),
+                valuations=np.array(self.valuations, dtype=np.float64),
+                resources={k: np.array(v, dtype=np.float64) for k, v in self.resources.items()},
+                timestamps=np.array(self.timestamps, dtype=np.float64),
+                requested={k: np.array(v, dtype=np.bool_) for k, v in self.requested.items()}
+            )
+
+
 class AuctionMechanism:
     """Implements the continuous double auction mechanism"""
     
-    def __init__(self, config: Dict):
+    def __init__(self, config: Dict, resource_keys: Optional[Sequence[str]] = None):
         self.config = config
         self.auction_interval = config.get('auction_interval', 1.0)
         self.min_bid_increment = config.get('min_bid_increment', 0.01)
         self.backpressure_sensitivity = config.get('backpressure_sensitivity', 2.0)
+        # Wide auctions may rank bids by quantized efficiency (O(n) radix sort) instead of
+        # exactly; this changes which bids win, so it is off unless bucket_sort_min_bids is set
+        self.efficiency_buckets = min(config.get('efficiency_buckets', 1024), np.iinfo(np.int16).max)
+        self.bucket_sort_min_bids = config.get('bucket_sort_min_bids') or None
+        # Narrow auctions are cheaper to run on the bid dicts than to pack into arrays
+        self.packed_min_bids = config.get('packed_min_bids', 1000)
+        
+        # Canonical resource ordering for the packed bid matrix; resource vectors passed
+        # as arrays are aligned with its leading entries
+        self._resource_keys: List[str] = list(resource_keys or [])
+        self._resource_index: Dict[str, int] = {k: i for i, k in enumerate(self._resource_keys)}
         
+    def warmup(self, n_bids: int = 8):
+        """
+        Compile the winner-selection kernel ahead of the first auction round
+
+        Runs the kernel once on dummy bids with the dtypes the packers produce, so
+        numba's compilation (or cache load) is not paid inside a measured round. No
+        auction state is touched.
+        """
+        n_resources = max(len(self._resource_keys), 1)
+        R = np.ones((n_bids, n_resources), dtype=RESOURCE_DTYPE)
+        v = np.ones(n_bids, dtype=np.float64)
+        tenant_idx = np.zeros(n_bids, dtype=np.int64)
+        remaining = np.full(n_resources, n_bids, dtype=RESOURCE_DTYPE)
+        balances = np.full(1, float(n_bids))
+        order = np.arange(n_bids, dtype=np.intp)
+        _greedy_select(R, v, tenant_idx, remaining, balances, order)
+    
     def formulate_bid(self, tenant_id: str, operator_id: str, 
                      base_resources: Dict[str, float], 
                      current_input_rate: float, reference_input_rate: float,
@@ -69,7 +177,7 @@ class AuctionMechanism:
         
         # Calculate urgency factor based on backpressure
         queue_ratio = current_queue_length / max_queue_length if max_queue_length > 0 else 0.0
-        urgency_factor = np.exp(self.backpressure_sensitivity * queue_ratio)
+        urgency_factor = math.exp(self.backpressure_sensitivity * queue_ratio)
         
         # Final valuation includes urgency factor
         valuation = base_valuation * urgency_factor
@@ -78,65 +186,314 @@ class AuctionMechanism:
             tenant_id=tenant_id,
             resource_bundle=actual_resources,
             valuation=valuation,
-            timestamp=timestamp
+            timestamp=timestamp,
+            total_resources=base_valuation
         )
     
-    def determine_winners(self, bids: List[Bid], available_resources: Dict[str, float],
+    def formulate_bids_batch(self, base_R: np.ndarray, complexity: np.ndarray,
+                             rate_ratio: np.ndarray, queue_ratio: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Formulate many bids at once, vectorized over operators
+
+        Args:
+            base_R: Base resource requirements (n_bids, n_resources)
+            complexity: Processing complexity of each operator (n_bids,)
+            rate_ratio: Current/reference input rate of each operator (n_bids,)
+            queue_ratio: Current/max queue length of each operator (n_bids,)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Packed resource bundles R and valuations v
+        """
+        base_R = np.asarray(base_R, dtype=np.float64)
+        scale = 1.0 + np.asarray(complexity, dtype=np.float64) * np.asarray(rate_ratio, dtype=np.float64)
+        R = base_R * scale[:, None]
+
+        # Base valuation scaled by the backpressure urgency factor
+        urgency_factor = np.exp(self.backpressure_sensitivity * np.asarray(queue_ratio, dtype=np.float64))
+        v = R.sum(axis=1) * urgency_factor
+
+        return R, v
+    
+    def _pack_bids(self, bids: List[Bid],
+                   available_resources: Union[Dict[str, float], np.ndarray],
+                   tenant_balances: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray,
+                                                               np.ndarray, np.ndarray, List[str]]:
+        """
+        Pack bids into a Structure-of-Arrays layout for winner determination
+
+        Args:
+            bids: List of bids submitted in this auction round
+            available_resources: Available resources {resource_type: amount}, or a vector
+                aligned with the resource ordering
+            tenant_balances: Current virtual currency balances {tenant_id: balance}
+
+        Returns:
+            Tuple: (R, v, tenant_idx, remaining, balances, tenant_ids) where R is the
+            (n_bids, n_resources) bundle matrix in ``self._resource_keys`` order
+        """
+        self._register_resources(available_resources)
+        bundles = [bid.resource_bundle for bid in bids]
+        if set().union(*bundles).difference(self._resource_index):
+            for bundle in bundles:
+                self._register_resources(bundle)
+
+        # Fill R one resource column at a time; a column is one list comprehension
+        n_bids = len(bids)
+        R = np.zeros((n_bids, len(self._resource_keys)), dtype=RESOURCE_DTYPE)
+        for j, resource_type in enumerate(self._resource_keys):
+            R[:, j] = [bundle.get(resource_type, 0.0) for bundle in bundles]
+
+        v = np.fromiter((bid.valuation for bid in bids), dtype=np.float64, count=n_bids)
+
+        # Map tenants to dense indices (first-seen order) so balances can live in a flat vector
+        tenant_ids: List[str] = list(dict.fromkeys(bid.tenant_id for bid in bids))
+        tenant_index = {t: i for i, t in enumerate(tenant_ids)}
+        tenant_idx = np.fromiter((tenant_index[bid.tenant_id] for bid in bids), dtype=np.int64, count=n_bids)
+
+        remaining, balances = self._pack_pool(available_resources, tenant_ids, tenant_balances)
+
+        return R, v, tenant_idx, remaining, balances, tenant_ids
+    
+    def _pack_batch(self, batch: BidBatch,
+                    available_resources: Union[Dict[str, float], np.ndarray],
+                    tenant_balances: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray,
+                                                                np.ndarray, np.ndarray, List[str]]:
+        """Pack a BidBatch column by column; same outputs as _pack_bids"""
+        key_index = self._resource_index
+        self._register_resources(available_resources)
+        self._register_resources(batch.resources)
+
+        R = np.zeros((len(batch), len(self._resource_keys)), dtype=RESOURCE_DTYPE)
+        for resource_type, amounts in batch.resources.items():
+            R[:, key_index[resource_type]] = amounts
+        v = np.asarray(batch.valuations, dtype=np.float64)
+
+        unique_tenants, tenant_idx = np.unique(batch.tenant_ids, return_inverse=True)
+        tenant_ids = unique_tenants.tolist()
+        remaining, balances = self._pack_pool(available_resources, tenant_ids, tenant_balances)
+
+        return R, v, tenant_idx.astype(np.int64), remaining, balances, tenant_ids
+    
+    def _register_resources(self, resources: Union[Iterable[str], np.ndarray]):
+        """Extend the stable resource ordering with resource types it has not seen yet"""
+        if isinstance(resources, np.ndarray):
+            if len(resources) > len(self._resource_keys):
+                raise ValueError("Resource vector is longer than the configured resource ordering")
+            return
+        key_index = self._resource_index
+        for resource_type in resources:
+            if resource_type not in key_index:
+                key_index[resource_type] = len(self._resource_keys)
+                self._resource_keys.append(resource_type)
+    
+    def _pack_pool(self, available_resources: Union[Dict[str, float], np.ndarray],
+                   tenant_ids: List[str], tenant_balances: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """Pack available resources and the bidding tenants' balances into vectors"""
+        n_resources = len(self._resource_keys)
+        if isinstance(available_resources, np.ndarray):
+            # One memcpy into a zero-padded vector instead of a dict copy
+            remaining = np.zeros(n_resources, dtype=RESOURCE_DTYPE)
+            remaining[:len(available_resources)] = available_resources
+        else:
+            remaining = np.array([available_resources.get(k, 0.0) for k in self._resource_keys],
+                                 dtype=RESOURCE_DTYPE)
+        balances = np.array([tenant_balances.get(t, 0.0) for t in tenant_ids], dtype=np.float64)
+        return remaining, balances
+    
+    def _select_winners(self, R: np.ndarray, v: np.ndarray, tenant_idx: np.ndarray,
+                        remaining: np.ndarray, balances: np.ndarray,
+                        efficiency: np.ndarray, totals: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run greedy selection in efficiency order, sorting only the bids that can still win
+
+        When the auction is oversubscribed only the top-K bids can fit, so those are
+        partitioned out and sorted first; the remainder is sorted and considered only
+        if one of them is still feasible afterwards. If bucket_sort_min_bids is set,
+        auctions of at least that many bids are ranked by _bucket_order instead.
+        remaining and balances are updated in place.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Winner mask and the order bids were considered in
+        """
+        n_bids = len(v)
+        if self.bucket_sort_min_bids is not None and n_bids >= self.bucket_sort_min_bids:
+            order = self._bucket_order(efficiency)
+            winner_mask, _, _ = _greedy_select(R, v, tenant_idx, remaining, balances, order)
+            return winner_mask, order
+
+        neg_efficiency = -efficiency
+
+        # Estimate how many bids fit from the total capacity and the average bundle size
+        avg_bundle = float(totals.mean())
+        capacity = float(remaining.clip(min=0.0).sum())
+        n_head = 2 * int(capacity / avg_bundle) + 1 if avg_bundle > 0 else n_bids
+
+        if n_head * 2 > n_bids:
+            order = np.argsort(neg_efficiency, kind='stable')
+            winner_mask, _, _ = _greedy_select(R, v, tenant_idx, remaining, balances, order)
+            return winner_mask, order
+
+        # Head holds every bid at least as efficient as the n_head-th best (ties included),
+        # so it is exactly a prefix of the full stable sort
+        kth = np.partition(neg_efficiency, n_head - 1)[n_head - 1]
+        head = np.flatnonzero(neg_efficiency <= kth)
+        head = head[np.argsort(neg_efficiency[head], kind='stable')]
+        winner_mask, _, _ = _greedy_select(R, v, tenant_idx, remaining, balances, head)
+
+        # Resources and balances only shrink, so a tail bid that does not fit now never will
+        tail = np.flatnonzero(neg_efficiency > kth)
+        fits = np.all(R[tail] <= remaining, axis=1) & (balances[tenant_idx[tail]] >= v[tail])
+        if fits.any():
+            tail = tail[np.argsort(neg_efficiency[tail], kind='stable')]
+            tail_mask, _, _ = _greedy_select(R, v, tenant_idx, remaining, balances, tail)
+            winner_mask |= tail_mask
+
+        return winner_mask, np.concatenate([head, tail])
+    
+    def _bucket_order(self, efficiency: np.ndarray) -> np.ndarray:
+        """
+        Order bids by efficiency quantized into efficiency_buckets levels, highest first
+
+        Bids in the same bucket keep their submission order. The bucket keys are int16,
+        for which NumPy's stable sort is a radix sort.
+        """
+        n_buckets = self.efficiency_buckets
+        max_efficiency = float(efficiency.max())
+        if not max_efficiency > 0:
+            return np.argsort(-efficiency, kind='stable')
+
+        buckets = np.clip(efficiency * (n_buckets / max_efficiency), 0, n_buckets - 1).astype(np.int16)
+        return np.argsort(n_buckets - 1 - buckets, kind='stable')
+    
+    def determine_winners(self, bids: List[Bid], available_resources: Union[Dict[str, float], np.ndarray],
                          tenant_balances: Dict[str, float]) -> Tuple[List[Allocation], List[Bid]]:
         """
         Determine winners of the auction using greedy approximation
         
         Args:
             bids: List of bids submitted in this auction round
-            available_resources: Available resources {resource_type: amount}
+            available_resources: Available resources {resource_type: amount}, or a vector
+                aligned with the resource ordering
             tenant_balances: Current virtual currency balances {tenant_id: balance}
             
         Returns:
             Tuple[List[Allocation], List[Bid]]: Winning allocations and rejected bids
         """
+        if not bids:
+            return [], []
+        if len(bids) < self.packed_min_bids and not isinstance(available_resources, np.ndarray):
+            return self._determine_winners_dict(bids, available_resources, tenant_balances)
+        
+        R, v, tenant_idx, remaining, balances, tenant_ids = self._pack_bids(
+            bids, available_resources, tenant_balances
+        )
+        
+        # Rank bids by efficiency (valuation/resource ratio), highest first
+        totals = np.fromiter((bid.total_resources for bid in bids), dtype=np.float64, count=len(bids))
+        efficiency = np.divide(v, totals, out=np.zeros_like(v), where=totals != 0)
+        winner_mask, order = self._select_winners(R, v, tenant_idx, remaining, balances,
+                                                  efficiency, totals)
+        
+        # Rebuild allocations for winners only, in the order they were accepted
+        accepted = winner_mask[order]
+        winning_bids = [bids[i] for i in order[accepted].tolist()]
+        allocations = [
+            Allocation(
+                tenant_id=bid.tenant_id,
+                resource_bundle=bid.resource_bundle,
+                price_paid=bid.valuation,
+                timestamp=bid.timestamp
+            )
+            for bid in winning_bids
+        ]
+        rejected_bids = [bids[i] for i in order[~accepted].tolist()]
+        
+        # Deduct from tenant balances
+        for t in np.unique(tenant_idx[winner_mask]):
+            tenant_balances[tenant_ids[t]] = float(balances[t])
+        
+        return allocations, rejected_bids
+    
+    def _determine_winners_dict(self, bids: List[Bid], available_resources: Dict[str, float],
+                                tenant_balances: Dict[str, float]) -> Tuple[List[Allocation], List[Bid]]:
+        """Greedy winner determination directly on the bid dicts; same outputs as determine_winners"""
         # Sort bids by efficiency (valuation/resource ratio)
         def calculate_efficiency(bid: Bid) -> float:
-            total_resources = sum(bid.resource_bundle.values())
-            if total_resources == 0:
+            if bid.total_resources == 0:
                 return 0.0
-            return bid.valuation / total_resources
-        
+            return bid.valuation / bid.total_resources
+
         sorted_bids = sorted(bids, key=calculate_efficiency, reverse=True)
-        
+
         allocations = []
         rejected_bids = []
         remaining_resources = available_resources.copy()
-        
+
         for bid in sorted_bids:
             # Check if tenant has enough balance
             if tenant_balances.get(bid.tenant_id, 0) < bid.valuation:
                 rejected_bids.append(bid)
                 continue
-            
+
             # Check if resources are available
             can_allocate = True
             for resource_type, amount in bid.resource_bundle.items():
                 if remaining_resources.get(resource_type, 0) < amount:
                     can_allocate = False
                     break
-            
+
             if can_allocate:
-                # Allocate resources
-                allocation = Allocation(
+                allocations.append(Allocation(
                     tenant_id=bid.tenant_id,
                     resource_bundle=bid.resource_bundle,
                     price_paid=bid.valuation,
                     timestamp=bid.timestamp
-                )
-                allocations.append(allocation)
-                
+                ))
+
                 # Update remaining resources
                 for resource_type, amount in bid.resource_bundle.items():
                     remaining_resources[resource_type] -= amount
-                
+
                 # Deduct from tenant balance
                 tenant_balances[bid.tenant_id] -= bid.valuation
             else:
                 rejected_bids.append(bid)
-        
-        return allocations, rejected_bids
\ No newline at end of file
+
+        return allocations, rejected_bids
+    
+    def determine_winners_batch(self, batch: BidBatch, available_resources: Union[Dict[str, float], np.ndarray],
+                                tenant_balances: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Determine winners of the auction for bids packed as a BidBatch
+
+        Args:
+            batch: Bids submitted in this auction round
+            available_resources: Available resources {resource_type: amount}, or a vector
+                aligned with the resource ordering
+            tenant_balances: Current virtual currency balances {tenant_id: balance}
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: int32 indices into the batch of the winning bids,
+            in the order they were accepted, and of the rejected bids
+        """
+        if len(batch) == 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+
+        R, v, tenant_idx, remaining, balances, tenant_ids = self._pack_batch(
+            batch, available_resources, tenant_balances
+        )
+
+        # Rank bids by efficiency (valuation/resource ratio), highest first
+        totals = np.zeros(len(batch), dtype=np.float64)
+        for amounts in batch.resources.values():
+            totals += amounts
+        efficiency = np.divide(v, totals, out=np.zeros_like(v), where=totals != 0)
+        winner_mask, order = self._select_winners(R, v, tenant_idx, remaining, balances,
+                                                  efficiency, totals)
+
+        # Deduct from tenant balances
+        for t in np.unique(tenant_idx[winner_mask]):
+            tenant_balances[tenant_ids[t]] = float(balances[t])
+
+        accepted = winner_mask[order]
+        return order[accepted].astype(np.int32), order[~accepted].astype(np.int32)
\ No newline at end of file
@@ -4,165 +4,131 @@ Implements all baselines mentioned in the paper
 """
 
 import numpy as np
-from typing import Dict, List, Tuple
-from core.scheduler import StreamBazaarScheduler
-from core.metrics import MetricsTracker
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from core.baselines_vec import VectorizedBaseline
 
 
-class FlinkDefaultBaseline:
+class FlinkDefaultBaseline(VectorizedBaseline):
     """Flink-Default baseline: Native Flink scheduler with static slot allocation"""
     
-    def __init__(self, hyperparameters: Dict):
-        self.config = hyperparameters
-        self.metrics_tracker = MetricsTracker()
+    def __init__(self, hyperparameters: Dict, resource_keys: Optional[Sequence[str]] = None):
+        super().__init__(hyperparameters, resource_keys)
         self.tenant_allocations = {}
         self.tenant_balances = {}
+        # Tenant order only changes when balances do, so it is cached between rounds
+        self._sorted_tenants: Optional[List[str]] = None
+        self._sorted_for: Optional[Tuple[str, ...]] = None
         
     def initialize_tenant(self, tenant_id: str, priority_weight: float = 1.0):
         """Initialize a tenant with static resource allocation"""
         # In Flink default, resources are statically allocated
         # We simulate this by giving each tenant a fixed share
         self.tenant_balances[tenant_id] = 100.0 * priority_weight
-        
-    def run_scheduling_round(self, tenant_requirements: Dict[str, Dict[str, float]], 
-                            available_resources: Dict[str, float]) -> Dict[str, Dict[str, float]]:
-        """Run a scheduling round with static allocation"""
-        allocations = {}
-        remaining_resources = available_resources.copy()
-        
-        # Sort tenants by priority (higher priority weight first)
-        sorted_tenants = sorted(
-            tenant_requirements.items(), 
-            key=lambda x: self.tenant_balances.get(x[0], 0), 
-            reverse=True
-        )
-        
-        # Allocate resources statically
-        for tenant_id, requirements in sorted_tenants:
-            allocation = {}
-            for resource_type, required_amount in requirements.items():
-                # Allocate minimum of what's required and what's available
-                allocated_amount = min(required_amount, remaining_resources.get(resource_type, 0))
-                allocation[resource_type] = allocated_amount
-                remaining_resources[resource_type] = remaining_resources.get(resource_type, 0) - allocated_amount
-            
-            allocations[tenant_id] = allocation
-            
-            # Record for metrics
-            total_required = sum(requirements.values())
-            total_allocated = sum(allocation.values())
-            efficiency = total_allocated / total_required if total_required > 0 else 0
-            self.metrics_tracker.record_auction_results([total_required], [1 if efficiency > 0.5 else 0])
-        
-        return allocations
+        self._sorted_tenants = None
+    
+    def _order_tenants(self, tenant_requirements: Dict[str, Dict[str, float]]) -> List[Tuple[str, Dict[str, float]]]:
+        """Sort tenants by priority (higher priority weight first)"""
+        tenant_ids = tuple(tenant_requirements)
+        if self._sorted_tenants is None or tenant_ids != self._sorted_for:
+            self._sorted_tenants = sorted(
+                tenant_ids, 
+                key=lambda tenant_id: self.tenant_balances.get(tenant_id, 0), 
+                reverse=True
+            )
+            self._sorted_for = tenant_ids
+        return [(tenant_id, tenant_requirements[tenant_id]) for tenant_id in self._sorted_tenants]
     
-    def get_evaluation_metrics(self) -> Dict[str, float]:
-        """Get evaluation metrics"""
-        return self.metrics_tracker.get_all_metrics()
+    def _record_tenant(self, tenant_id: str, total_required: float, total_allocated: float):
+        """Record allocation efficiency for metrics"""
+        efficiency = total_allocated / total_required if total_required > 0 else 0
+        self.metrics_tracker.record_auction_results([total_required], [1 if efficiency > 0.5 else 0])
 
 
-class DS2Baseline:
+class DS2Baseline(VectorizedBaseline):
     """DS2 baseline: Auto-scaling approach"""
     
-    def __init__(self, hyperparameters: Dict):
-        self.config = hyperparameters
-        self.metrics_tracker = MetricsTracker()
+    def __init__(self, hyperparameters: Dict, resource_keys: Optional[Sequence[str]] = None):
+        super().__init__(hyperparameters, resource_keys)
         self.tenant_allocations = {}
         self.scaling_factor = 1.2  # Scaling factor for resource allocation
-        
-    def initialize_tenant(self, tenant_id: str, priority_weight: float = 1.0):
-        """Initialize a tenant"""
-        pass  # DS2 doesn't use virtual currency system
-        
-    def run_scheduling_round(self, tenant_requirements: Dict[str, Dict[str, float]], 
-                            available_resources: Dict[str, float]) -> Dict[str, Dict[str, float]]:
-        """Run a scheduling round with dynamic scaling"""
-        allocations = {}
-        remaining_resources = available_resources.copy()
-        
-        # DS2 scales resources based on demand
-        for tenant_id, requirements in tenant_requirements.items():
-            allocation = {}
-            for resource_type, required_amount in requirements.items():
-                # Scale the allocation based on demand
-                scaled_amount = min(required_amount * self.scaling_factor, remaining_resources.get(resource_type, 0))
-                allocation[resource_type] = scaled_amount
-                remaining_resources[resource_type] = remaining_resources.get(resource_type, 0) - scaled_amount
-            
-            allocations[tenant_id] = allocation
-            
-            # Record for metrics
-            total_required = sum(requirements.values())
-            total_allocated = sum(allocation.values())
-            self.metrics_tracker.record_auction_results([total_required], [1 if total_allocated > 0 else 0])
-        
-        return allocations
     
-    def get_evaluation_metrics(self) -> Dict[str, float]:
-        """Get evaluation metrics"""
-        return self.metrics_tracker.get_all_metrics()
+    def _uniform_factor(self) -> float:
+        """DS2 scales resources based on demand"""
+        return self.scaling_factor
 
 
-class CAPSysBaseline:
+class CAPSysBaseline(VectorizedBaseline):
     """CAPSys baseline: Contention-aware placement strategy"""
     
-    def __init__(self, hyperparameters: Dict):
-        self.config = hyperparameters
-        self.metrics_tracker = MetricsTracker()
-        self.resource_contention = {}  # Track resource contention
-        
-    def initialize_tenant(self, tenant_id: str, priority_weight: float = 1.0):
-        """Initialize a tenant"""
-        pass
-        
-    def run_scheduling_round(self, tenant_requirements: Dict[str, Dict[str, float]], 
-                            available_resources: Dict[str, float]) -> Dict[str, Dict[str, float]]:
-        """Run a scheduling round with contention awareness"""
-        allocations = {}
-        remaining_resources = available_resources.copy()
-        
-        # CAPSys considers resource contention
-        for tenant_id, requirements in tenant_requirements.items():
-            allocation = {}
-            contention_factor = 1.0  # Default factor
-            
-            # Adjust allocation based on resource contention
+    def __init__(self, hyperparameters: Dict, resource_keys: Optional[Sequence[str]] = None):
+        super().__init__(hyperparameters, resource_keys)
+        # Track resource contention, one entry per resource type in _res_order
+        self._res_order: List[str] = []
+        self._res_index: Dict[str, int] = {}
+        self._contention = np.zeros(0, dtype=np.float64)
+    
+    @property
+    def resource_contention(self) -> Dict[str, float]:
+        """Current contention of each resource type seen so far"""
+        return dict(zip(self._res_order, self._contention.tolist()))
+    
+    def _register(self, resource_types: Iterable[str]):
+        """Add contention entries for resource types not seen before"""
+        new_keys = [k for k in resource_types if k not in self._res_index]
+        if new_keys:
+            for resource_type in new_keys:
+                self._res_index[resource_type] = len(self._res_order)
+                self._res_order.append(resource_type)
+            self._contention = np.concatenate([self._contention, np.zeros(len(new_keys))])
+    
+    def _tenant_factors(self, tenant_items: List[Tuple[str, Dict[str, float]]],
+                        available_resources: Dict[str, float]) -> List[Dict[str, float]]:
+        """Contention factor of each tenant's resources, given the contention left by earlier tenants"""
+        res_index = self._res_index
+        for _, requirements in tenant_items:
+            self._register(requirements)
+        contention = self._contention.tolist()
+        
+        tenant_factors = []
+        for _, requirements in tenant_items:
+            factors = {}
             for resource_type, required_amount in requirements.items():
-                # Simulate contention effect
-                if resource_type in self.resource_contention:
-                    contention_factor = 1.0 - (self.resource_contention[resource_type] * 0.3)
-                
-                # Allocate resources considering contention
-                allocated_amount = min(required_amount * contention_factor, remaining_resources.get(resource_type, 0))
-                allocation[resource_type] = allocated_amount
-                remaining_resources[resource_type] = remaining_resources.get(resource_type, 0) - allocated_amount
-                
-                # Update contention
-                if resource_type not in self.resource_contention:
-                    self.resource_contention[resource_type] = 0.0
-                self.resource_contention[resource_type] += 0.1 * (required_amount / available_resources.get(resource_type, 1.0))
-            
-            allocations[tenant_id] = allocation
-            
-            # Record for metrics
-            total_required = sum(requirements.values())
-            total_allocated = sum(allocation.values())
-            self.metrics_tracker.record_auction_results([total_required], [1 if total_allocated > 0 else 0])
-        
-        return allocations
+                i = res_index[resource_type]
+                factors[resource_type] = 1.0 - contention[i] * 0.3
+                # Contention grows with each tenant's demand relative to capacity
+                capacity = available_resources.get(resource_type, 1.0)
+                contention[i] += 0.1 * (required_amount / (capacity if capacity > 0 else 1.0))
+            tenant_factors.append(factors)
+        
+        self._contention[:] = contention
+        return tenant_factors
     
-    def get_evaluation_metrics(self) -> Dict[str, float]:
-        """Get evaluation metrics"""
-        return self.metrics_tracker.get_all_metrics()
+    def _allocation_factor(self, req_matrix: np.ndarray, capacity: np.ndarray,
+                           key_index: Dict[str, int]) -> np.ndarray:
+        """Contention factor seen by each tenant, given the contention left by earlier tenants"""
+        self._register(key_index)
+        cols = np.array([self._res_index[k] for k in key_index], dtype=np.int64)
+        contention = self._contention[cols]
+        
+        # Contention grows with each tenant's demand relative to capacity
+        increments = 0.1 * (req_matrix / np.where(capacity > 0, capacity, 1.0))
+        after = contention + np.cumsum(increments, axis=0)
+        before = np.vstack([contention[None, :], after[:-1]])
+        
+        # Carry the contention left by the last tenant over to the next round
+        if len(after):
+            self._contention[cols] = after[-1]
+        
+        return 1.0 - before * 0.3
 
 
-class TALOSBaseline:
+class TALOSBaseline(VectorizedBaseline):
     """TALOS baseline: Task-level autoscaler"""
     
-    def __init__(self, hyperparameters: Dict):
-        self.config = hyperparameters
-        self.metrics_tracker = MetricsTracker()
+    def __init__(self, hyperparameters: Dict, resource_keys: Optional[Sequence[str]] = None):
+        super().__init__(hyperparameters, resource_keys)
         self.task_monitoring = {}  # Track individual tasks
+        self.over_provisioning_factor = 0.9  # Reduce over-provisioning
         
     def initialize_tenant(self, tenant_id: str, priority_weight: float = 1.0):
         """Initialize a tenant"""
@@ -170,38 +136,13 @@ class TALOSBaseline:
             "tasks": {},
             "over_provisioning": 0.0
         }
-        
-    def run_scheduling_round(self, tenant_requirements: Dict[str, Dict[str, float]], 
-                            available_resources: Dict[str, float]) -> Dict[str, Dict[str, float]]:
-        """Run a scheduling round with task-level monitoring"""
-        allocations = {}
-        remaining_resources = available_resources.copy()
-        
-        # TALOS monitors individual tasks to minimize over-provisioning
-        for tenant_id, requirements in tenant_requirements.items():
-            allocation = {}
-            over_provisioning_factor = 0.9  # Reduce over-provisioning
-            
-            # Allocate resources with reduced over-provisioning
-            for resource_type, required_amount in requirements.items():
-                # Reduce allocation to minimize over-provisioning
-                allocated_amount = min(required_amount * over_provisioning_factor, remaining_resources.get(resource_type, 0))
-                allocation[resource_type] = allocated_amount
-                remaining_resources[resource_type] = remaining_resources.get(resource_type, 0) - allocated_amount
-            
-            allocations[tenant_id] = allocation
-            
-            # Record for metrics
-            total_required = sum(requirements.values())
-            total_allocated = sum(allocation.values())
-            self.metrics_tracker.record_auction_results([total_required], [1 if total_allocated > 0 else 0])
-            
-            # Update over-provisioning metric
-            if tenant_id in self.task_monitoring:
-                self.task_monitoring[tenant_id]["over_provisioning"] = max(0, 1.0 - (total_allocated / total_required)) if total_required > 0 else 0
-        
-        return allocations
     
-    def get_evaluation_metrics(self) -> Dict[str, float]:
-        """Get evaluation metrics"""
-        return self.metrics_tracker.get_all_metrics()
\ No newline at end of file
+    def _uniform_factor(self) -> float:
+        """TALOS monitors individual tasks to minimize over-provisioning"""
+        return self.over_provisioning_factor
+    
+    def _record_tenant(self, tenant_id: str, total_required: float, total_allocated: float):
+        """Record allocation outcome and update the over-provisioning metric"""
+        super()._record_tenant(tenant_id, total_required, total_allocated)
+        if tenant_id in self.task_monitoring:
+            self.task_monitoring[tenant_id]["over_provisioning"] = max(0, 1.0 - (total_allocated / total_required)) if total_required > 0 else 0
\ No newline at end of file
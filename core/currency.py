@@ -2,10 +2,30 @@
 Virtual currency system for StreamBazaar
 """
 
-from typing import Dict, List
+from typing import Dict, Iterator, List, Mapping, Sequence, Tuple
 import numpy as np
 
 
+class _BalancesView(Mapping[str, float]):
+    """Live read-only mapping {tenant_id: current balance} over a CurrencySystem"""
+    
+    def __init__(self, currency: "CurrencySystem"):
+        self._currency = currency
+    
+    def __getitem__(self, tenant_id: str) -> float:
+        idx = self._currency._idx[tenant_id]
+        return float(self._currency._realize(idx))
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._currency._tenant_ids)
+    
+    def __len__(self) -> int:
+        return self._currency._n
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._currency.get_balances_view()!r})"
+
+
 class CurrencySystem:
     """Manages the virtual currency system for tenants"""
     
@@ -15,8 +35,88 @@ class CurrencySystem:
         self.base_allocation = config.get('currency', {}).get('base_allocation', 100.0)
         self.priority_weight_factor = config.get('currency', {}).get('priority_weight_factor', 1.0)
         self.utilization_reward_factor = config.get('currency', {}).get('utilization_reward_factor', 0.5)
-        self.balances: Dict[str, float] = {}
-        self.history: Dict[str, List[float]] = {}
+        self.record_history = config.get('currency', {}).get('record_history', False)
+        self.history_length = config.get('currency', {}).get('history_length', 1024)
+        
+        # Dense balance vector indexed by tenant; capacity grows by doubling.
+        # Decay is applied lazily: _balances[i] is the balance as of tick _last_t[i],
+        # and the current balance is _balances[i] * (1 - decay_rate) ** (_t - _last_t[i]).
+        # _synced_t is the tick every balance was last brought up to under one factor,
+        # None once a single tenant has moved ahead of the others
+        self._idx: Dict[str, int] = {}
+        self._tenant_ids: List[str] = []
+        self._n = 0
+        self._t = 0
+        self._synced_t = 0
+        self._balances = np.zeros(8, dtype=np.float64)
+        self._last_t = np.zeros(8, dtype=np.int64)
+        # Circular (tenant, tick) float32 buffer of balance snapshots, one column per closed
+        # decay tick when record_history is enabled; allocated on first use
+        self._hist = np.empty((0, self.history_length), dtype=np.float32)
+        self._hist_first = np.zeros(8, dtype=np.int64)  # first recorded tick of each tenant
+        self._hist_initial = np.full(8, np.nan)  # balance set by initialize_tenant, NaN if none
+        self._hist_t = 0  # number of ticks recorded
+        self._balances_view = _BalancesView(self)
+    
+    @property
+    def balances(self) -> Mapping[str, float]:
+        """
+        Live read-only view of the current balances {tenant_id: balance}
+        
+        Each lookup reads one balance; use get_balances_view for a snapshot of all of
+        them, and initialize_tenant, allocate_currency or deduct_balance to change one.
+        """
+        return self._balances_view
+    
+    @property
+    def history(self) -> Dict[str, List[float]]:
+        """Balance history {tenant_id: [balance per tick]}"""
+        return {tenant_id: self.get_history(tenant_id) for tenant_id in self._tenant_ids}
+    
+    def _index(self, tenant_id: str) -> int:
+        """Get the dense index of a tenant, registering it with a zero balance if new"""
+        idx = self._idx.get(tenant_id)
+        if idx is None:
+            if self._n == len(self._balances):
+                self._balances = np.concatenate([self._balances, np.zeros_like(self._balances)])
+                self._last_t = np.concatenate([self._last_t, np.zeros_like(self._last_t)])
+                self._hist_first = np.concatenate([self._hist_first, np.zeros_like(self._hist_first)])
+                self._hist_initial = np.concatenate([self._hist_initial, np.full_like(self._hist_initial, np.nan)])
+            idx = self._idx[tenant_id] = self._n
+            self._tenant_ids.append(tenant_id)
+            self._balances[idx] = 0.0
+            self._stamp(idx)
+            self._hist_first[idx] = self._hist_t
+            self._n += 1
+        return idx
+    
+    def _stamp(self, idx: int):
+        """Mark a tenant's stored balance as current as of this tick"""
+        self._last_t[idx] = self._t
+        if self._synced_t != self._t:
+            self._synced_t = None
+    
+    def _realize(self, idx: int) -> float:
+        """Bring a tenant's stored balance up to the current tick and return it"""
+        elapsed = self._t - self._last_t[idx]
+        if elapsed:
+            self._balances[idx] *= (1.0 - self.decay_rate) ** elapsed
+            self._stamp(idx)
+        return self._balances[idx]
+    
+    def _realize_all(self) -> np.ndarray:
+        """Bring every stored balance up to the current tick and return them, in index order"""
+        n = self._n
+        balances = self._balances[:n]
+        if self._synced_t != self._t:
+            # While all tenants share a tick, one scalar factor decays them all
+            if self._synced_t is None:
+                balances *= (1.0 - self.decay_rate) ** (self._t - self._last_t[:n])
+            else:
+                balances *= (1.0 - self.decay_rate) ** (self._t - self._synced_t)
+            self._last_t[:n] = self._t
+            self._synced_t = self._t
+        return balances
     
     def initialize_tenant(self, tenant_id: str, priority_weight: float = 1.0):
         """
@@ -26,16 +126,37 @@ class CurrencySystem:
             tenant_id: ID of the tenant
             priority_weight: Priority weight for the tenant (higher = more important)
         """
-        self.balances[tenant_id] = self.base_allocation * priority_weight
-        if tenant_id not in self.history:
-            self.history[tenant_id] = []
-        self.history[tenant_id].append(self.balances[tenant_id])
+        idx = self._index(tenant_id)
+        self._balances[idx] = self.base_allocation * priority_weight
+        self._stamp(idx)
+        if self.record_history:
+            # History starts at the starting balance; re-initializing a tenant restarts it
+            self._hist_initial[idx] = self._balances[idx]
+            self._hist_first[idx] = self._hist_t
+    
+    def snapshot(self):
+        """
+        Record every tenant's current balance as one history tick
+        
+        Balance updates within a round are not recorded individually; the round's
+        outcome is flushed here in a single vectorized store. No-op unless
+        record_history is enabled.
+        """
+        if not self.record_history:
+            return
+        if self._hist.shape[0] < self._n:
+            hist = np.empty((len(self._balances), self.history_length), dtype=np.float32)
+            hist[:self._hist.shape[0]] = self._hist
+            self._hist = hist
+        self._hist[:self._n, self._hist_t % self.history_length] = self._realize_all()
+        self._hist_t += 1
     
     def apply_decay(self):
         """Apply currency decay to all tenants to prevent hoarding"""
-        for tenant_id in self.balances:
-            self.balances[tenant_id] *= (1.0 - self.decay_rate)
-            self.history[tenant_id].append(self.balances[tenant_id])
+        # Close the current tick in the history before decaying into the next one
+        self.snapshot()
+        # Balances are decayed lazily when next read or modified
+        self._t += 1
     
     def allocate_currency(self, tenant_id: str, priority_weight: float, 
                          avg_utilization: float, total_utilization: float):
@@ -57,14 +178,9 @@ class CurrencySystem:
         allocation = self.base_allocation * (priority_weight + utilization_reward)
         
         # Add to tenant's balance
-        if tenant_id not in self.balances:
-            self.balances[tenant_id] = 0.0
-        self.balances[tenant_id] += allocation
-        
-        # Record in history
-        if tenant_id not in self.history:
-            self.history[tenant_id] = []
-        self.history[tenant_id].append(self.balances[tenant_id])
+        idx = self._index(tenant_id)
+        self._realize(idx)
+        self._balances[idx] += allocation
     
     def deduct_balance(self, tenant_id: str, amount: float) -> bool:
         """
@@ -77,19 +193,67 @@ class CurrencySystem:
         Returns:
             bool: True if deduction was successful, False if insufficient balance
         """
-        if self.balances.get(tenant_id, 0) >= amount:
-            self.balances[tenant_id] -= amount
-            if tenant_id in self.history:
-                self.history[tenant_id].append(self.balances[tenant_id])
-            else:
-                self.history[tenant_id] = [self.balances[tenant_id]]
+        idx = self._idx.get(tenant_id)
+        if idx is not None and self._realize(idx) >= amount:
+            self._balances[idx] -= amount
             return True
         return False
     
+    def deduct_many(self, pairs: Sequence[Tuple[str, float]]) -> List[bool]:
+        """
+        Deduct currency from many tenants, in order
+        
+        Args:
+            pairs: (tenant_id, amount) pairs; a tenant may appear more than once
+        
+        Returns:
+            List[bool]: Whether each deduction was successful, as for deduct_balance
+        """
+        if not pairs:
+            return []
+        # Bring every balance up to the current tick once, instead of per deduction
+        self._realize_all()
+        
+        balances = self._balances
+        results = []
+        for tenant_id, amount in pairs:
+            idx = self._idx.get(tenant_id)
+            ok = idx is not None and bool(balances[idx] >= amount)
+            if ok:
+                balances[idx] -= amount
+            results.append(ok)
+        return results
+    
+    def get_balances_view(self) -> Mapping[str, float]:
+        """Snapshot of all current balances {tenant_id: balance}, in one vectorized pass"""
+        return dict(zip(self._tenant_ids, self._realize_all().tolist()))
+    
     def get_balance(self, tenant_id: str) -> float:
         """Get the current balance for a tenant"""
-        return self.balances.get(tenant_id, 0.0)
+        idx = self._idx.get(tenant_id)
+        return float(self._realize(idx)) if idx is not None else 0.0
     
     def get_history(self, tenant_id: str) -> List[float]:
-        """Get the balance history for a tenant"""
-        return self.history.get(tenant_id, []).copy()
\ No newline at end of file
+        """
+        Get the balance history for a tenant: its starting balance, one entry per decay
+        tick, then the current balance
+        
+        Ticks are only recorded when record_history is enabled, and only the last
+        history_length of them are kept; the starting balance is dropped once its
+        first tick is no longer kept.
+        """
+        idx = self._idx.get(tenant_id)
+        if idx is None:
+            return []
+        history = []
+        if idx < self._hist.shape[0]:
+            first = int(self._hist_first[idx])
+            start = max(first, self._hist_t - self.history_length)
+            ticks = np.arange(start, self._hist_t) % self.history_length
+            history = self._hist[idx, ticks].tolist()
+        # Until a tick closes the current balance is the starting balance
+        if self.record_history and not np.isnan(self._hist_initial[idx]) and \
+                0 < self._hist_t - int(self._hist_first[idx]) <= self.history_length:
+            history.insert(0, float(self._hist_initial[idx]))
+        history.append(float(self._realize(idx)))
+        return history
\ No newline at end of file
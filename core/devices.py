@@ -4,12 +4,16 @@ Device definitions and power/price calculations for StreamBazaar
 
 import yaml
 import os
-from typing import Dict, Any
+import numpy as np
+from typing import Dict, Any, Optional, Tuple, Union
 
 
 class Device:
     """Represents a computing device with resource specifications and pricing"""
     
+    __slots__ = ("name", "category", "resources", "base_price", "power_consumption",
+                 "_resource_order", "_base_price_arr", "_default_prices", "_kw")
+    
     def __init__(self, name: str, category: str, resources: Dict[str, float], 
                  base_price: Dict[str, float], power_consumption: float):
         self.name = name
@@ -17,12 +21,28 @@ class Device:
         self.resources = resources
         self.base_price = base_price
         self.power_consumption = power_consumption
+        
+        # Base prices packed in a canonical resource ordering for vectorized pricing
+        self._resource_order: Tuple[str, ...] = tuple(base_price.keys())
+        self._base_price_arr = np.fromiter(base_price.values(), dtype=np.float64, count=len(base_price))
+        self._default_prices: Tuple[float, ...] = tuple(self.calculate_resource_prices().tolist())
+        # Power draw in kW, so power costs need no unit conversion
+        self._kw = power_consumption / 1000.0
+    
+    @property
+    def resource_order(self) -> Tuple[str, ...]:
+        """Resource types in the order used by calculate_resource_prices"""
+        return self._resource_order
+    
+    @property
+    def default_prices(self) -> Tuple[float, ...]:
+        """Prices at the default utilization of calculate_resource_price, in ``resource_order`` order"""
+        return self._default_prices
     
     def calculate_power_cost(self, time_hours: float, cost_per_kwh: float = 0.15) -> float:
         """Calculate the power cost for running this device for a given time"""
-        # Convert watts to kWh and multiply by cost
-        kwh = (self.power_consumption * time_hours) / 1000.0
-        return kwh * cost_per_kwh
+        # kW times hours gives kWh, multiplied by cost
+        return self._kw * time_hours * cost_per_kwh
     
     def calculate_resource_price(self, resource_type: str, utilization: float = 1.0) -> float:
         """Calculate the price for a resource based on utilization"""
@@ -32,6 +52,18 @@ class Device:
         base = self.base_price[resource_type]
         # Simple pricing model - increase price with utilization
         return base * (1.0 + 0.5 * utilization)
+    
+    def calculate_resource_prices(self, util_arr: Union[np.ndarray, float] = 1.0) -> np.ndarray:
+        """
+        Calculate prices for all resources at once
+        
+        Args:
+            util_arr: Utilizations in ``resource_order`` order, or a scalar applied to all
+        
+        Returns:
+            np.ndarray: Prices in ``resource_order`` order
+        """
+        return self._base_price_arr * (1.0 + 0.5 * np.asarray(util_arr, dtype=np.float64))
 
 
 class DeviceManager:
@@ -39,6 +71,7 @@ class DeviceManager:
     
     def __init__(self, config_path: str = "config/devices.yaml"):
         self.devices: Dict[str, Device] = {}
+        self.resource_types: Tuple[str, ...] = ()
         self.load_devices(config_path)
     
     def load_devices(self, config_path: str):
@@ -58,6 +91,14 @@ class DeviceManager:
                 power_consumption=device_data['power_consumption']
             )
             self.devices[device_name] = device
+        
+        # Canonical resource ordering shared by packed resource vectors
+        resource_types = list(config.get('resource_types', []))
+        for device in self.devices.values():
+            for resource_type in device.resources:
+                if resource_type not in resource_types:
+                    resource_types.append(resource_type)
+        self.resource_types = tuple(resource_types)
     
     def get_device(self, name: str) -> Device:
         """Get a device by name"""
@@ -70,5 +111,14 @@ class DeviceManager:
         return self.devices.copy()
 
 
-# Global device manager instance
-device_manager = DeviceManager()
\ No newline at end of file
+# Global device manager instance, loaded on first access as ``devices.device_manager``
+_device_manager: Optional[DeviceManager] = None
+
+
+def __getattr__(name: str):
+    global _device_manager
+    if name == "device_manager":
+        if _device_manager is None:
+            _device_manager = DeviceManager()
+        return _device_manager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -4,92 +4,453 @@ Implements all metrics mentioned in the paper
 """
 
 import numpy as np
-from typing import List, Dict, Tuple, Any
-from core.devices import device_manager
+from enum import IntEnum
+from typing import List, Dict, Tuple, Any, Optional, Sequence, Union
+
+
+class Priority(IntEnum):
+    """Tenant priority, stored as its uint8 code in the latency columns"""
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+
+
+# Plain int codes for the priority column; string priorities are mapped through _PRIORITY_CODES
+# and unknown ones count as medium
+PRIORITY_LOW, PRIORITY_MEDIUM, PRIORITY_HIGH = int(Priority.LOW), int(Priority.MEDIUM), int(Priority.HIGH)
+_PRIORITY_CODES: Dict[str, int] = {"low": PRIORITY_LOW, "medium": PRIORITY_MEDIUM, "high": PRIORITY_HIGH}
+
+
+def _priority_code(priority: Union[str, Priority]) -> int:
+    """Column code of a priority given as a string or a Priority"""
+    if isinstance(priority, str):
+        return _PRIORITY_CODES.get(priority, PRIORITY_MEDIUM)
+    return int(priority)
+
+
+# Auction results with fewer entries than this are summed without NumPy
+_SHORT_RESULTS = 256
+
+_PRIORITY_NAMES = ("low", "medium", "high")
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """View of an array that cannot be written through"""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class _Growable:
+    """Append-only typed NumPy buffer with amortized doubling growth"""
+    
+    def __init__(self, dtype, shape: Tuple[int, ...] = (), capacity: int = 64):
+        self._buf = np.empty((capacity,) + shape, dtype=dtype)
+        self._n = 0
+    
+    def __len__(self) -> int:
+        return self._n
+    
+    def _reserve(self, n: int):
+        if n > len(self._buf):
+            buf = np.empty((max(2 * len(self._buf), n),) + self._buf.shape[1:], dtype=self._buf.dtype)
+            buf[:self._n] = self._buf[:self._n]
+            self._buf = buf
+    
+    def append(self, value):
+        """Append one element (or one row for buffers with a shape)"""
+        self._reserve(self._n + 1)
+        self._buf[self._n] = value
+        self._n += 1
+    
+    def extend(self, values: Sequence):
+        """Append all elements of values"""
+        end = self._n + len(values)
+        self._reserve(end)
+        self._buf[self._n:end] = values
+        self._n = end
+    
+    def view(self) -> np.ndarray:
+        """The filled part of the buffer, without copying"""
+        return self._buf[:self._n]
+
+
+class _Window:
+    """Fixed-capacity ring buffer keeping a running sum of its most recent samples"""
+    
+    def __init__(self, capacity: int):
+        self._buf = np.zeros(capacity, dtype=np.float64)
+        self._head = 0
+        self.fill = 0
+        self.total = 0.0
+    
+    def push(self, value: float):
+        """Add a sample, evicting the oldest one once the window is full"""
+        buf, head = self._buf, self._head
+        if self.fill == len(buf):
+            self.total -= buf[head]
+        else:
+            self.fill += 1
+        buf[head] = value
+        self.total += value
+        head += 1
+        if head == len(buf):
+            head = 0
+            # Resync once per lap so rounding from add/subtract pairs cannot accumulate
+            self.total = float(buf.sum())
+        self._head = head
+    
+    def view(self) -> np.ndarray:
+        """Samples in the window, oldest first"""
+        if self.fill < len(self._buf):
+            return self._buf[:self.fill]
+        return np.concatenate((self._buf[self._head:], self._buf[:self._head]))
+
+
+class _SLARequirements(dict):
+    """SLA dict that notifies its tracker whenever it is mutated"""
+    
+    def __init__(self, on_change, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._on_change = on_change
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._on_change()
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._on_change()
+    
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._on_change()
+    
+    def __ior__(self, other):
+        super().__ior__(other)
+        self._on_change()
+        return self
+    
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._on_change()
+        return value
+    
+    def pop(self, key, *default):
+        value = super().pop(key, *default)
+        self._on_change()
+        return value
+    
+    def popitem(self):
+        item = super().popitem()
+        self._on_change()
+        return item
+    
+    def clear(self):
+        super().clear()
+        self._on_change()
+    
+    def __reduce__(self):
+        # Rebuild through __init__ so copies and unpickling never notify a half-restored tracker
+        return type(self), (self._on_change, dict(self))
 
 
 class MetricsTracker:
     """Tracks and computes evaluation metrics for StreamBazaar"""
     
-    def __init__(self):
-        # Metrics history
-        self.resource_utilization_history: List[Dict[str, float]] = []
-        self.latency_history: List[Dict[str, Dict[str, Any]]] = []
-        self.valuations_history: List[List[float]] = []
-        self.allocations_history: List[List[int]] = []
-        self.throughput_history: List[float] = []
-        self.migration_impact_history: List[float] = []
-        
-        # SLA requirements for high-priority applications
-        self.sla_requirements: Dict[str, float] = {
+    def __init__(self, keep_history: bool = False, metrics_window: Optional[int] = None):
+        self.keep_history = keep_history
+        # With a window, RUE, throughput and MIS average only the latest metrics_window
+        # samples instead of everything since the start of the run
+        self.metrics_window = metrics_window or None
+        if self.metrics_window is not None:
+            self._util_window = _Window(self.metrics_window)
+            self._throughput_window = _Window(self.metrics_window)
+            self._migration_window = _Window(self.metrics_window)
+        
+        # Streaming accumulators, so no metric has to walk the history
+        self._util_sum = 0.0  # sum of cpu + memory + network utilization over windows
+        self._n_util = 0
+        self._high_total = 0  # high-priority tenants
+        self._high_violations = 0  # high-priority tenants whose latest latency exceeds the SLA
+        self._social_welfare = 0.0
+        self._maximum_welfare = 0.0
+        self._n_windows = 0
+        self._tenant_sums: List[float] = []  # total allocation per tenant position
+        self._throughput_sum = 0.0
+        self._n_throughput = 0
+        self._migration_sum = 0.0
+        self._n_migration = 0
+        
+        # Latest latency, priority and SLA violation of each tenant, one row per tenant
+        self._latency_row: Dict[str, int] = {}
+        self._latency = _Growable(np.float64, capacity=8)
+        self._prio = _Growable(np.uint8, capacity=8)
+        self._violation = _Growable(np.bool_, capacity=8)
+        
+        # Metrics history, only recorded when keep_history is enabled
+        # Resource utilization as one (cpu, memory, network) row per window
+        self._util = _Growable(np.float32, (3,))
+        # Auction results of all windows concatenated CSR-style: window w holds entries
+        # _offsets[w]:_offsets[w + 1] of _vals/_allocs
+        self._vals = _Growable(np.float32)
+        self._allocs = _Growable(np.float32)
+        self._offsets = _Growable(np.int64)
+        self._offsets.append(0)
+        self._throughput = _Growable(np.float32)
+        self._migration_impact = _Growable(np.float32)
+        
+        # SLA requirements for high-priority applications; the latency threshold is
+        # cached as a float in _sla_high and violations are recounted whenever it changes
+        self.sla_requirements = {
             "high_priority_latency": 100.0  # ms
         }
     
-    def record_resource_utilization(self, utilizations: Dict[str, float]):
-        """Record resource utilization metrics"""
-        self.resource_utilization_history.append(utilizations.copy())
-    
-    def record_latency(self, tenant_id: str, latency: float, priority: str = "medium"):
-        """Record latency for a tenant"""
-        if not self.latency_history:
-            self.latency_history.append({})
-        self.latency_history[-1][tenant_id] = {
-            "latency": float(latency),
-            "priority": priority
+    @property
+    def sla_requirements(self) -> Dict[str, float]:
+        """SLA requirements; changes are picked up by the TLVR counters"""
+        return self._sla_requirements
+    
+    @sla_requirements.setter
+    def sla_requirements(self, requirements: Dict[str, float]):
+        self._sla_requirements = _SLARequirements(self._on_sla_change, requirements)
+        self._on_sla_change()
+    
+    def _on_sla_change(self):
+        """Re-derive the cached threshold and every tenant's violation flag"""
+        self._sla_high = float(self._sla_requirements.get("high_priority_latency", 100.0))
+        violations = self._violation.view()
+        np.logical_and(self._prio.view() == PRIORITY_HIGH, self._latency.view() > self._sla_high,
+                       out=violations)
+        self._high_violations = int(np.count_nonzero(violations))
+    
+    def _require_history(self, name: str):
+        if not self.keep_history:
+            raise RuntimeError(f"{name} is only recorded by MetricsTracker(keep_history=True)")
+    
+    @property
+    def resource_utilization_history(self) -> np.ndarray:
+        """Read-only (cpu, memory, network) utilization per window; needs keep_history"""
+        self._require_history("resource_utilization_history")
+        return _read_only(self._util.view())
+    
+    @property
+    def latency_history(self) -> List[Dict[str, Dict[str, Any]]]:
+        """
+        Latest latency of each tenant, as [{tenant_id: {"latency", "priority"}}]
+        
+        Only the latest measurement of a tenant is kept, so this is available without
+        keep_history; unknown priorities read back as "medium".
+        """
+        latencies, prio = self._latency.view().tolist(), self._prio.view().tolist()
+        return [{
+            tenant_id: {"latency": latencies[row], "priority": _PRIORITY_NAMES[prio[row]]}
+            for tenant_id, row in self._latency_row.items()
+        }]
+    
+    @property
+    def valuations_history(self) -> List[np.ndarray]:
+        """Read-only bid valuations of each auction window; needs keep_history"""
+        self._require_history("valuations_history")
+        return np.split(_read_only(self._vals.view()), self._offsets.view()[1:-1])
+    
+    @property
+    def allocations_history(self) -> List[np.ndarray]:
+        """Read-only allocation flags of each auction window; needs keep_history"""
+        self._require_history("allocations_history")
+        return np.split(_read_only(self._allocs.view()), self._offsets.view()[1:-1])
+    
+    @property
+    def throughput_history(self) -> np.ndarray:
+        """
+        Read-only throughput samples: the current window with metrics_window,
+        otherwise the recorded history, which needs keep_history
+        """
+        if self.metrics_window is not None:
+            return _read_only(self._throughput_window.view())
+        self._require_history("throughput_history")
+        return _read_only(self._throughput.view())
+    
+    @property
+    def migration_impact_history(self) -> np.ndarray:
+        """
+        Read-only migration impact samples: the current window with metrics_window,
+        otherwise the recorded history, which needs keep_history
+        """
+        if self.metrics_window is not None:
+            return _read_only(self._migration_window.view())
+        self._require_history("migration_impact_history")
+        return _read_only(self._migration_impact.view())
+    
+    @property
+    def window_fill(self) -> Dict[str, int]:
+        """Number of samples currently in each sliding window (empty without metrics_window)"""
+        if self.metrics_window is None:
+            return {}
+        return {
+            "utilization": self._util_window.fill,
+            "throughput": self._throughput_window.fill,
+            "migration_impact": self._migration_window.fill
         }
     
-    def record_auction_results(self, valuations: List[float], allocations: List[int]):
-        """Record auction results for economic efficiency calculation"""
-        self.valuations_history.append(valuations.copy())
-        self.allocations_history.append(allocations.copy())
+    def record_resource_utilization(self, utilizations: Dict[str, float]):
+        """
+        Record resource utilization metrics
+        
+        Only the cpu, memory and network values are read; the dict is not retained,
+        so callers may reuse or mutate it afterwards.
+        """
+        cpu = utilizations.get("cpu", 0.0)
+        memory = utilizations.get("memory", 0.0)
+        network = utilizations.get("network", 0.0)
+        if self.metrics_window is not None:
+            window = self._util_window
+            window.push(cpu + memory + network)
+            self._util_sum, self._n_util = window.total, window.fill
+        else:
+            self._util_sum += cpu + memory + network
+            self._n_util += 1
+        
+        if self.keep_history:
+            self._util.append((cpu, memory, network))
+    
+    def record_latency(self, tenant_id: str, latency: float, priority: Union[str, Priority] = "medium"):
+        """Record latency for a tenant; priority may be a string or a Priority"""
+        row = self._latency_row_for(tenant_id)
+        prio, violations = self._prio.view(), self._violation.view()
+        
+        # Replace the tenant's previous measurement, without branching on the priority
+        code = _priority_code(priority)
+        is_high = int(code == PRIORITY_HIGH)
+        violation = is_high & int(latency > self._sla_high)
+        self._high_total += is_high - int(prio[row] == PRIORITY_HIGH)
+        self._high_violations += violation - int(violations[row])
+        
+        self._latency.view()[row] = latency
+        prio[row] = code
+        violations[row] = violation
+    
+    def record_latencies(self, tenant_ids: Sequence[str], latencies: Sequence[float],
+                         priorities: Union[str, Priority, Sequence[Union[str, Priority]]] = "medium"):
+        """
+        Record latencies for many tenants at once
+        
+        Args:
+            tenant_ids: Tenants the latencies belong to
+            latencies: Latency of each tenant
+            priorities: Priority of each tenant, or one priority for all of them
+        """
+        n = len(tenant_ids)
+        rows = np.fromiter((self._latency_row_for(t) for t in tenant_ids), dtype=np.int64, count=n)
+        if isinstance(priorities, (str, Priority)):
+            codes = np.full(n, _priority_code(priorities), dtype=np.uint8)
+        else:
+            codes = np.fromiter((_priority_code(p) for p in priorities), dtype=np.uint8, count=n)
+        latencies = np.asarray(latencies, dtype=np.float64)
+        
+        # Only the last measurement of a tenant listed more than once counts
+        _, last = np.unique(rows[::-1], return_index=True)
+        keep = n - 1 - last
+        rows, codes, latencies = rows[keep], codes[keep], latencies[keep]
+        
+        prio, violations = self._prio.view(), self._violation.view()
+        is_high = codes == PRIORITY_HIGH
+        violation = is_high & (latencies > self._sla_high)
+        self._high_total += np.count_nonzero(is_high) - np.count_nonzero(prio[rows] == PRIORITY_HIGH)
+        self._high_violations += np.count_nonzero(violation) - np.count_nonzero(violations[rows])
+        
+        self._latency.view()[rows] = latencies
+        prio[rows] = codes
+        violations[rows] = violation
+    
+    def _latency_row_for(self, tenant_id: str) -> int:
+        """Row of a tenant in the latency columns, added as a low-priority row if new"""
+        row = self._latency_row.get(tenant_id)
+        if row is None:
+            row = self._latency_row[tenant_id] = len(self._latency_row)
+            self._latency.append(0.0)
+            self._prio.append(PRIORITY_LOW)
+            self._violation.append(False)
+        return row
+    
+    def record_auction_results(self, valuations: Sequence[float], allocations: Sequence[int]):
+        """
+        Record auction results for economic efficiency calculation
+        
+        Inputs may be lists or NumPy arrays. They are folded into the accumulators
+        and, with keep_history, copied once into the history buffers; they are not
+        retained. Short Python sequences are summed in plain Python, which beats
+        converting them to arrays below _SHORT_RESULTS entries.
+        """
+        n_tenants = len(allocations)
+        tenant_sums = self._tenant_sums
+        if n_tenants > len(tenant_sums):
+            tenant_sums.extend([0.0] * (n_tenants - len(tenant_sums)))
+        
+        if (n_tenants < _SHORT_RESULTS and not isinstance(valuations, np.ndarray)
+                and not isinstance(allocations, np.ndarray)):
+            # Social welfare (sum of v_i * x_i) and maximum welfare (sum of v_i) of this window
+            social_welfare = 0.0
+            for i, (valuation, allocation) in enumerate(zip(valuations, allocations)):
+                social_welfare += valuation * allocation
+                tenant_sums[i] += allocation
+            self._social_welfare += social_welfare
+            self._maximum_welfare += sum(valuations)
+        else:
+            valuations = np.asarray(valuations, dtype=np.float64)
+            allocations = np.asarray(allocations, dtype=np.float64)
+            self._social_welfare += float(np.dot(valuations, allocations))
+            self._maximum_welfare += float(valuations.sum())
+            tenant_sums[:n_tenants] = (np.asarray(tenant_sums[:n_tenants]) + allocations).tolist()
+        
+        if self.keep_history:
+            self._vals.extend(valuations)
+            self._allocs.extend(allocations)
+            self._offsets.append(len(self._vals))
+        self._n_windows += 1
     
     def record_throughput(self, throughput: float):
         """Record system throughput"""
-        self.throughput_history.append(float(throughput))
+        if self.metrics_window is not None:
+            window = self._throughput_window
+            window.push(throughput)
+            self._throughput_sum, self._n_throughput = window.total, window.fill
+        else:
+            self._throughput_sum += throughput
+            self._n_throughput += 1
+        if self.keep_history:
+            self._throughput.append(throughput)
     
     def record_migration_impact(self, impact: float):
         """Record migration impact on performance"""
-        self.migration_impact_history.append(float(impact))
+        if self.metrics_window is not None:
+            window = self._migration_window
+            window.push(impact)
+            self._migration_sum, self._n_migration = window.total, window.fill
+        else:
+            self._migration_sum += impact
+            self._n_migration += 1
+        if self.keep_history:
+            self._migration_impact.append(impact)
     
     def calculate_resource_utilization_efficiency(self) -> float:
         """
         Resource Utilization Efficiency (RUE): 
         Average of CPU, memory, and network utilization
         """
-        if not self.resource_utilization_history:
+        if self._n_util == 0:
             return 0.0
         
-        total_efficiency = 0.0
-        count = len(self.resource_utilization_history)
-        
-        for utilizations in self.resource_utilization_history:
-            # Average of CPU, memory, and network utilization
-            avg_utilization = np.mean([
-                utilizations.get("cpu", 0.0),
-                utilizations.get("memory", 0.0),
-                utilizations.get("network", 0.0)
-            ])
-            total_efficiency += float(avg_utilization)
-        
-        return float(total_efficiency / count) if count > 0 else 0.0
+        # Mean over windows of the per-window mean equals the mean over all entries
+        return float(self._util_sum / (3 * self._n_util))
     
     def calculate_tail_latency_violation_rate(self) -> float:
         """
         Tail Latency Violation Rate (TLVR):
         Percentage of time windows where 99th percentile latency exceeds SLA
         """
-        if not self.latency_history:
-            return 0.0
-        
-        violations = 0
-        total_measurements = 0
-        
-        for time_window in self.latency_history:
-            for tenant_data in time_window.values():
-                if tenant_data["priority"] == "high":
-                    total_measurements += 1
-                    if tenant_data["latency"] > self.sla_requirements["high_priority_latency"]:
-                        violations += 1
+        total_measurements = self._high_total
+        violations = self._high_violations
         
         return float(violations / total_measurements * 100) if total_measurements > 0 else 0.0
     
@@ -99,19 +460,12 @@ class MetricsTracker:
         Ratio of achieved social welfare to theoretical maximum
         EEI = (sum of v_i * x_i) / (sum of v_i)
         """
-        if not self.valuations_history or not self.allocations_history:
+        if self._n_windows == 0:
             return 0.0
         
-        total_social_welfare = 0.0
-        total_maximum_welfare = 0.0
-        
-        for valuations, allocations in zip(self.valuations_history, self.allocations_history):
-            # Calculate achieved social welfare (sum of v_i * x_i)
-            for i, (valuation, allocation) in enumerate(zip(valuations, allocations)):
-                total_social_welfare += valuation * allocation
-            
-            # Calculate theoretical maximum welfare (sum of v_i)
-            total_maximum_welfare += sum(valuations)
+        # Achieved social welfare (sum of v_i * x_i) and theoretical maximum (sum of v_i)
+        total_social_welfare = self._social_welfare
+        total_maximum_welfare = self._maximum_welfare
         
         return float(total_social_welfare / total_maximum_welfare) if total_maximum_welfare > 0 else 0.0
     
@@ -121,26 +475,18 @@ class MetricsTracker:
         J = (sum of x_i)^2 / (n * sum of x_i^2)
         where x_i is the resource allocation for tenant i
         """
-        if not self.allocations_history:
+        if self._n_windows == 0:
             return 1.0  # Perfect fairness if no allocations
         
-        # Sum allocations for each tenant across all time windows
-        tenant_allocations: Dict[int, float] = {}
-        
-        for allocations in self.allocations_history:
-            for i, allocation in enumerate(allocations):
-                if i not in tenant_allocations:
-                    tenant_allocations[i] = 0.0
-                tenant_allocations[i] += float(allocation)
-        
-        if not tenant_allocations:
+        if len(self._tenant_sums) == 0:
             return 1.0
         
-        allocation_values = list(tenant_allocations.values())
+        # Sums over the per-tenant allocation totals across all time windows
+        allocation_values = np.asarray(self._tenant_sums, dtype=np.float64)
         n = len(allocation_values)
         
-        sum_allocations = sum(allocation_values)
-        sum_squared_allocations = sum(x * x for x in allocation_values)
+        sum_allocations = float(allocation_values.sum())
+        sum_squared_allocations = float(np.dot(allocation_values, allocation_values))
         
         if sum_squared_allocations == 0:
             return 1.0
@@ -152,10 +498,10 @@ class MetricsTracker:
         Normalized Throughput:
         T_actual / T_max
         """
-        if not self.throughput_history:
+        if self._n_throughput == 0:
             return 0.0
         
-        actual_throughput = float(np.mean(self.throughput_history))
+        actual_throughput = float(self._throughput_sum / self._n_throughput)
         # Assuming theoretical maximum is 1.0 for normalization
         max_throughput = 1.0
         
@@ -177,10 +523,10 @@ class MetricsTracker:
         Migration Impact Score (MIS):
         Average performance degradation during operator migrations
         """
-        if not self.migration_impact_history:
+        if self._n_migration == 0:
             return 0.0
         
-        return float(np.mean(self.migration_impact_history))
+        return float(self._migration_sum / self._n_migration)
     
     def get_all_metrics(self) -> Dict[str, float]:
         """Get all metrics as a dictionary"""
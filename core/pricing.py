@@ -4,7 +4,20 @@ Dynamic pricing engine for StreamBazaar
 
 import numpy as np
 from typing import Dict, List, Tuple, Any, Optional
-from core.devices import device_manager
+from core import devices
+
+
+def _utilization_adjustment(utilization: float, target: float, aggressiveness: float,
+                            reduction: float) -> float:
+    """Price adjustment factor for a utilization, given the adjustment parameters"""
+    if utilization > target:
+        # Price increases when over-utilized
+        excess = utilization - target
+        return 1.0 + aggressiveness * (excess ** 2)
+    else:
+        # Price decreases when under-utilized
+        deficit = target - utilization
+        return 1.0 - reduction * deficit
 
 
 class PricingEngine:
@@ -17,6 +30,8 @@ class PricingEngine:
         self.target_utilization = config.get('target_utilization', 0.8)
         self.over_utilization_aggressiveness = config.get('over_utilization_aggressiveness', 1.0)
         self.under_utilization_reduction = config.get('under_utilization_reduction', 0.5)
+        # Per-device (device, resource_order, base_prices), filled on first use
+        self._device_cache: Dict[str, Tuple[Any, Tuple[str, ...], Tuple[float, ...]]] = {}
     
     def compute_base_price(self, resource_type: str, current_utilization: float, 
                           spot_price: float, previous_price: Optional[float] = None) -> float:
@@ -32,19 +47,69 @@ class PricingEngine:
         Returns:
             float: Computed base price
         """
+        smoothing = self.smoothing_param
+        target = self.target_utilization
+        aggressiveness = self.over_utilization_aggressiveness
+        reduction = self.under_utilization_reduction
+        
         # If no previous price, use spot price as starting point
         if previous_price is None:
             previous_price = spot_price
             
         # Exponential smoothing
-        smoothed_price = (self.smoothing_param * previous_price + 
-                         (1 - self.smoothing_param) * spot_price)
+        smoothed_price = smoothing * previous_price + (1 - smoothing) * spot_price
         
         # Adjustment based on utilization
-        adjustment = self._compute_utilization_adjustment(current_utilization)
+        adjustment = _utilization_adjustment(current_utilization, target, aggressiveness, reduction)
+        
+        return smoothed_price * adjustment
+    
+    def compute_base_price_vec(self, utilization: np.ndarray, spot_price: np.ndarray,
+                               previous_price: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Vectorized compute_base_price over many resources at once
+        
+        Args:
+            utilization: Current utilizations, any shape
+            spot_price: Spot prices, broadcastable against utilization
+            previous_price: Previous prices for smoothing, or None to start from the spot prices
+        
+        Returns:
+            np.ndarray: Computed base prices
+        """
+        utilization = np.asarray(utilization, dtype=np.float64)
+        spot_price = np.asarray(spot_price, dtype=np.float64)
+        if previous_price is None:
+            smoothed_price = spot_price
+        else:
+            smoothed_price = (self.smoothing_param * np.asarray(previous_price, dtype=np.float64) +
+                              (1 - self.smoothing_param) * spot_price)
+        
+        # Array form of _utilization_adjustment: quadratic increase above the target
+        # utilization, linear decrease below it
+        delta = utilization - self.target_utilization
+        adjustment = np.where(delta > 0,
+                              1.0 + self.over_utilization_aggressiveness * (delta * delta),
+                              1.0 + self.under_utilization_reduction * delta)
         
         return smoothed_price * adjustment
     
+    def compute_all_devices_prices(self, util_matrix: np.ndarray, spot_matrix: np.ndarray,
+                                   prev_matrix: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Compute prices for many devices in one batch
+        
+        Args:
+            util_matrix: Utilizations (n_devices, n_resources) in a shared resource ordering
+                such as ``DeviceManager.resource_types``
+            spot_matrix: Spot prices, same layout as util_matrix
+            prev_matrix: Previous prices, same layout as util_matrix, or None
+        
+        Returns:
+            np.ndarray: Prices (n_devices, n_resources)
+        """
+        return self.compute_base_price_vec(util_matrix, spot_matrix, prev_matrix)
+    
     def _compute_utilization_adjustment(self, utilization: float) -> float:
         """
         Compute price adjustment based on utilization
@@ -55,14 +120,20 @@ class PricingEngine:
         Returns:
             float: Adjustment factor
         """
-        if utilization > self.target_utilization:
-            # Price increases when over-utilized
-            excess = utilization - self.target_utilization
-            return 1.0 + self.over_utilization_aggressiveness * (excess ** 2)
+        return _utilization_adjustment(utilization, self.target_utilization,
+                                       self.over_utilization_aggressiveness, self.under_utilization_reduction)
+    
+    def invalidate(self, device_name: Optional[str] = None):
+        """
+        Drop cached device pricing data after a device's definition changed
+        
+        Args:
+            device_name: Device to invalidate, or None to invalidate all devices
+        """
+        if device_name is None:
+            self._device_cache.clear()
         else:
-            # Price decreases when under-utilized
-            deficit = self.target_utilization - utilization
-            return 1.0 - self.under_utilization_reduction * deficit
+            self._device_cache.pop(device_name, None)
     
     def compute_device_price(self, device_name: str, utilizations: Dict[str, float]) -> Dict[str, float]:
         """
@@ -75,14 +146,25 @@ class PricingEngine:
         Returns:
             Dict[str, float]: Prices for each resource type
         """
-        device = device_manager.get_device(device_name)
-        prices = {}
+        entry = self._device_cache.get(device_name)
+        if entry is None:
+            device = devices.device_manager.get_device(device_name)
+            entry = self._device_cache[device_name] = (
+                device, device.resource_order, device.default_prices
+            )
+        _, order, base_prices = entry
         
-        for resource_type in device.base_price.keys():
-            utilization = utilizations.get(resource_type, 0.0)
-            base_price = device.calculate_resource_price(resource_type)
-            prices[resource_type] = self.compute_base_price(
-                resource_type, utilization, base_price
+        # compute_base_price inlined, with the parameters read once per device
+        smoothing = self.smoothing_param
+        target = self.target_utilization
+        aggressiveness = self.over_utilization_aggressiveness
+        reduction = self.under_utilization_reduction
+        prices = {}
+        for resource_type, base_price in zip(order, base_prices):
+            # With no previous price the base price is smoothed against itself
+            smoothed_price = smoothing * base_price + (1 - smoothing) * base_price
+            prices[resource_type] = smoothed_price * _utilization_adjustment(
+                utilizations.get(resource_type, 0.0), target, aggressiveness, reduction
             )
-            
+        
         return prices
\ No newline at end of file
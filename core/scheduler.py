@@ -3,10 +3,12 @@ Main scheduler implementation for StreamBazaar
 """
 
 import time
-from typing import Dict, List, Tuple
-from core.devices import DeviceManager, device_manager
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from core import devices
+from core.devices import DeviceManager
 from core.pricing import PricingEngine
-from core.auction import AuctionMechanism, Bid, Allocation
+from core.auction import AuctionMechanism, Bid, BidBatch, Allocation
 from core.currency import CurrencySystem
 from core.metrics import MetricsTracker
 
@@ -16,17 +18,22 @@ class StreamBazaarScheduler:
     
     def __init__(self, hyperparameters: Dict):
         self.config = hyperparameters
-        self.device_manager = device_manager
+        self.device_manager = devices.device_manager
+        # Resource ordering for available-resource vectors passed to run_auction_round
+        self.resource_keys: Tuple[str, ...] = self.device_manager.resource_types
         self.pricing_engine = PricingEngine(hyperparameters.get('pricing', {}))
-        self.auction_mechanism = AuctionMechanism(hyperparameters.get('auction', {}))
+        self.auction_mechanism = AuctionMechanism(hyperparameters.get('auction', {}), self.resource_keys)
         self.currency_system = CurrencySystem(hyperparameters)
-        self.metrics_tracker = MetricsTracker()
+        self.metrics_tracker = MetricsTracker(
+            keep_history=hyperparameters.get('evaluation', {}).get('keep_history', False),
+            metrics_window=hyperparameters.get('evaluation', {}).get('metrics_window')
+        )
         
         # State tracking
         self.current_allocations: Dict[str, Allocation] = {}
         self.tenant_balances: Dict[str, float] = {}
         self.resource_utilizations: Dict[str, Dict[str, float]] = {}
-        self.last_auction_time = time.time()
+        self.last_auction_time = time.monotonic()
         
     def initialize_tenant(self, tenant_id: str, priority_weight: float = 1.0):
         """
@@ -39,11 +46,21 @@ class StreamBazaarScheduler:
         self.currency_system.initialize_tenant(tenant_id, priority_weight)
         self.tenant_balances[tenant_id] = self.currency_system.get_balance(tenant_id)
     
+    def warmup(self, n_bids: int = 8):
+        """
+        Compile the auction kernels before the first round
+        
+        Args:
+            n_bids: Number of dummy bids to run through the kernels
+        """
+        self.auction_mechanism.warmup(n_bids)
+    
     def submit_bid(self, tenant_id: str, operator_id: str, 
                    base_resources: Dict[str, float], 
                    current_input_rate: float, reference_input_rate: float,
                    processing_complexity: float, current_queue_length: float,
-                   max_queue_length: float) -> Bid:
+                   max_queue_length: float, now: Optional[float] = None,
+                   builder: Optional[BidBatch.Builder] = None) -> Bid:
         """
         Submit a bid for resources on behalf of a tenant
         
@@ -56,6 +73,8 @@ class StreamBazaarScheduler:
             processing_complexity: Operator's sensitivity to input rate variations
             current_queue_length: Current queue length upstream of operator
             max_queue_length: Maximum queue capacity
+            now: Bid timestamp, time.time() if omitted
+            builder: If given, the bid is also appended to this batch builder
             
         Returns:
             Bid: The formulated bid
@@ -64,47 +83,135 @@ class StreamBazaarScheduler:
             tenant_id, operator_id, base_resources,
             current_input_rate, reference_input_rate,
             processing_complexity, current_queue_length,
-            max_queue_length, time.time()
+            max_queue_length, now if now is not None else time.time()
         )
+        if builder is not None:
+            builder.append(bid)
         return bid
     
-    def run_auction_round(self, bids: List[Bid], available_resources: Dict[str, float]) -> List[Allocation]:
+    def submit_bids(self, bid_specs: List[Dict[str, Any]]) -> BidBatch:
+        """
+        Submit many bids sharing one timestamp
+        
+        Args:
+            bid_specs: Keyword arguments of submit_bid for each bid
+        
+        Returns:
+            BidBatch: The formulated bids, packed column by column
+        """
+        now = time.time()
+        builder = BidBatch.Builder()
+        for spec in bid_specs:
+            self.submit_bid(**spec, now=now, builder=builder)
+        return builder.build()
+    
+    def submit_bids_batch(self, tenant_ids: Sequence[str], operator_ids: Sequence[str],
+                          base_resources: np.ndarray,
+                          current_input_rates: np.ndarray, reference_input_rates: Union[float, np.ndarray],
+                          processing_complexities: np.ndarray, current_queue_lengths: np.ndarray,
+                          max_queue_lengths: Union[float, np.ndarray],
+                          resource_types: Optional[Sequence[str]] = None) -> BidBatch:
+        """
+        Submit many bids given column by column, formulated in one vectorized pass
+        
+        Args:
+            tenant_ids: Tenant of each bid; an object array is used as-is, without copying
+            operator_ids: Operator of each bid
+            base_resources: Base resource requirements (n_bids, n_resources)
+            current_input_rates: Current input rate of each operator
+            reference_input_rates: Reference input rate of each operator, or one for all
+            processing_complexities: Sensitivity of each operator to input rate variations
+            current_queue_lengths: Current queue length upstream of each operator
+            max_queue_lengths: Maximum queue capacity of each operator, or one for all
+            resource_types: Resource of each base_resources column, the leading
+                ``resource_keys`` if omitted
+        
+        Returns:
+            BidBatch: The formulated bids, sharing one timestamp
+        """
+        base_resources = np.asarray(base_resources, dtype=np.float64)
+        if resource_types is None:
+            resource_types = self.resource_keys[:base_resources.shape[1]]
+        
+        # Same guards as formulate_bid for zero reference rates and queue capacities
+        reference = np.broadcast_to(np.asarray(reference_input_rates, dtype=np.float64), len(base_resources))
+        capacity = np.broadcast_to(np.asarray(max_queue_lengths, dtype=np.float64), len(base_resources))
+        rates = np.asarray(current_input_rates, dtype=np.float64)
+        queues = np.asarray(current_queue_lengths, dtype=np.float64)
+        rate_ratio = np.divide(rates, reference, out=np.ones_like(rates), where=reference > 0)
+        queue_ratio = np.divide(queues, capacity, out=np.zeros_like(queues), where=capacity > 0)
+        
+        R, v = self.auction_mechanism.formulate_bids_batch(
+            base_resources, processing_complexities, rate_ratio, queue_ratio
+        )
+        return BidBatch(
+            tenant_ids=np.asarray(tenant_ids, dtype=object),
+            valuations=v,
+            resources={resource_type: R[:, j] for j, resource_type in enumerate(resource_types)},
+            timestamps=np.full(len(v), time.time())
+        )
+    
+    def run_auction_round(self, bids: Union[List[Bid], BidBatch],
+                          available_resources: Union[Dict[str, float], np.ndarray]) -> List[Allocation]:
         """
         Run a round of the auction mechanism
         
         Args:
-            bids: List of bids to consider
-            available_resources: Currently available resources
+            bids: Bids to consider, as a list or a BidBatch
+            available_resources: Currently available resources, as a dict or a vector in
+                ``resource_keys`` order
             
         Returns:
             List[Allocation]: Winning allocations
         """
         # Update tenant balances from currency system
+        balances = self.currency_system.get_balances_view()
         for tenant_id in self.tenant_balances:
-            self.tenant_balances[tenant_id] = self.currency_system.get_balance(tenant_id)
+            self.tenant_balances[tenant_id] = balances.get(tenant_id, 0.0)
         
         # Run auction
-        allocations, rejected_bids = self.auction_mechanism.determine_winners(
-            bids, available_resources, self.tenant_balances
-        )
+        if isinstance(bids, BidBatch):
+            winner_idx, _ = self.auction_mechanism.determine_winners_batch(
+                bids, available_resources, self.tenant_balances
+            )
+            allocations = [
+                Allocation(
+                    tenant_id=bids.tenant_ids[i],
+                    resource_bundle=bids.bundle(i),
+                    price_paid=float(bids.valuations[i]),
+                    timestamp=float(bids.timestamps[i])
+                )
+                for i in winner_idx.tolist()
+            ]
+            valuations = bids.valuations
+            allocation_flags = np.isin(bids.tenant_ids, bids.tenant_ids[winner_idx]).astype(np.int8)
+        else:
+            allocations, rejected_bids = self.auction_mechanism.determine_winners(
+                bids, available_resources, self.tenant_balances
+            )
+            winner_ids = {a.tenant_id for a in allocations}
+            # Plain lists let record_auction_results sum short rounds without NumPy
+            valuations = [bid.valuation for bid in bids]
+            allocation_flags = [int(bid.tenant_id in winner_ids) for bid in bids]
         
         # Update allocations and tenant balances
         for allocation in allocations:
             self.current_allocations[allocation.tenant_id] = allocation
-            # Deduct payment from tenant balance
-            self.currency_system.deduct_balance(allocation.tenant_id, allocation.price_paid)
-            self.tenant_balances[allocation.tenant_id] = self.currency_system.get_balance(allocation.tenant_id)
+        # Deduct payments from tenant balances
+        self.currency_system.deduct_many([(a.tenant_id, a.price_paid) for a in allocations])
+        if allocations:
+            balances = self.currency_system.get_balances_view()
+            for allocation in allocations:
+                self.tenant_balances[allocation.tenant_id] = balances.get(allocation.tenant_id, 0.0)
         
-        # Record auction results for metrics
-        valuations = [bid.valuation for bid in bids]
-        allocation_flags = [1 if bid.tenant_id in [a.tenant_id for a in allocations] else 0 for bid in bids]
+        # Record auction results for metrics; a bid counts as allocated if its tenant won
         self.metrics_tracker.record_auction_results(valuations, allocation_flags)
         
         # Apply currency decay
         self.currency_system.apply_decay()
         
         # Update last auction time
-        self.last_auction_time = time.time()
+        self.last_auction_time = time.monotonic()
         
         return allocations
     
@@ -164,10 +271,7 @@ class StreamBazaarScheduler:
         if device_name not in self.resource_utilizations:
             # Return base prices if no utilization data
             device = self.device_manager.get_device(device_name)
-            prices = {}
-            for resource_type in device.base_price.keys():
-                prices[resource_type] = device.calculate_resource_price(resource_type)
-            return prices
+            return dict(zip(device.resource_order, device.default_prices))
         
         return self.pricing_engine.compute_device_price(
             device_name, self.resource_utilizations[device_name]
@@ -2,6 +2,13 @@
 Main script to demonstrate StreamBazaar functionality
 """
 
+import functools
+import hashlib
+import logging
+import os
+import sys
+import types
+from typing import Tuple
 import yaml
 import numpy as np
 from core.scheduler import StreamBazaarScheduler
@@ -12,11 +19,53 @@ from evaluation.plots import generate_evaluation_plots, generate_application_com
 from evaluation.applications import app_simulator
 from evaluation.scalability_evaluation import run_scalability_evaluation
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
+log = logging.getLogger("streambazaar")
+
+# One seeded generator for every demo draw, so runs are reproducible
+RNG = np.random.default_rng(0)
+
+# Resources offered in every scheduling round; read-only so no scheduler can change it
+# for the others
+AVAILABLE_RESOURCES = types.MappingProxyType({
+    "cpu": 32.0,
+    "memory": 128.0,
+    "network": 20.0
+})
+
+# Tenants of the simulation and baseline comparison; read-only and shared by both
+DEFAULT_TENANTS = types.MappingProxyType({
+    "tenant_1": types.MappingProxyType({"priority": 1.5, "operators": ("op_1", "op_2")}),
+    "tenant_2": types.MappingProxyType({"priority": 1.0, "operators": ("op_3", "op_4", "op_5")}),
+    "tenant_3": types.MappingProxyType({"priority": 0.8, "operators": ("op_6",)})
+})
+
+
+@functools.lru_cache(maxsize=None)
+def _load_config_cached(config_path: str, mtime: float) -> dict:
+    """Parse a YAML file; keyed on its modification time so edits are picked up"""
+    with open(config_path, 'rb') as file:
+        return yaml.load(file, Loader=SafeLoader)
+
+
+@functools.lru_cache(maxsize=None)
+def _operator_ids(num_operators: int) -> Tuple[str, ...]:
+    """Operator IDs op_1..op_<num_operators>, shared by every tenant and application"""
+    return tuple(f"op_{j+1}" for j in range(num_operators))
+
 
 def load_config(config_path: str) -> dict:
-    """Load configuration from YAML file"""
-    with open(config_path, 'r') as file:
-        return yaml.safe_load(file)
+    """
+    Load configuration from YAML file
+    
+    The parsed configuration is cached until the file changes, so every caller
+    gets the same dict and must not mutate it.
+    """
+    return _load_config_cached(config_path, os.path.getmtime(config_path))
 
 
 def simulate_streaming_cluster():
@@ -26,94 +75,103 @@ def simulate_streaming_cluster():
     
     # Initialize scheduler
     scheduler = StreamBazaarScheduler(hyperparameters)
+    # Compile the auction kernels now rather than inside the first round
+    scheduler.warmup()
     
     # Initialize tenants
-    tenants = {
-        "tenant_1": {"priority": 1.5, "operators": ["op_1", "op_2"]},
-        "tenant_2": {"priority": 1.0, "operators": ["op_3", "op_4", "op_5"]},
-        "tenant_3": {"priority": 0.8, "operators": ["op_6"]}
-    }
+    tenants = DEFAULT_TENANTS
     
     for tenant_id, tenant_info in tenants.items():
         scheduler.initialize_tenant(tenant_id, tenant_info["priority"])
     
     # Get available devices
     devices = device_manager.list_devices()
-    print(f"Available devices: {list(devices.keys())}")
+    device_names = list(devices.keys())
+    log.info(f"Available devices: {device_names}")
+    
+    tenant_items = list(tenants.items())
+    # Tenant and operator of every bid in submission order, packed once and reused by
+    # every round's batch
+    n_ops = sum(len(tenant_info["operators"]) for _, tenant_info in tenant_items)
+    bid_tenants = np.empty(n_ops, dtype=object)
+    bid_operators = np.empty(n_ops, dtype=object)
+    i = 0
+    for tenant_id, tenant_info in tenant_items:
+        for op_id in tenant_info["operators"]:
+            bid_tenants[i] = tenant_id
+            bid_operators[i] = op_id
+            i += 1
     
     # Simulate several auction rounds
     for round_num in range(5):
-        print(f"\n--- Auction Round {round_num + 1} ---")
+        # Report lines of this round, logged together once the round is done
+        lines = [f"\n--- Auction Round {round_num + 1} ---"]
         
-        # Update resource utilizations
-        for device_name in devices.keys():
+        # Update resource utilizations, one (cpu, memory, network) row per device
+        device_utilizations = RNG.uniform((0.5, 0.4, 0.3), (0.9, 0.8, 0.7), (len(devices), 3))
+        for device_name, (cpu, memory, network) in zip(device_names, device_utilizations.tolist()):
             utilizations = {
-                "cpu": np.random.uniform(0.5, 0.9),
-                "memory": np.random.uniform(0.4, 0.8),
-                "network": np.random.uniform(0.3, 0.7)
+                "cpu": cpu,
+                "memory": memory,
+                "network": network
             }
             scheduler.update_resource_utilization(device_name, utilizations)
         
-        # Submit bids from tenants
-        bids = []
-        for tenant_id, tenant_info in tenants.items():
-            for op_id in tenant_info["operators"]:
-                # Generate random resource requirements
-                base_resources = {
-                    "cpu": np.random.uniform(1, 4),
-                    "memory": np.random.uniform(2, 8),
-                    "network": np.random.uniform(0.5, 2)
-                }
-                
-                # Generate random operational parameters
-                current_input_rate = np.random.uniform(100, 1000)
-                reference_input_rate = 500.0
-                processing_complexity = np.random.uniform(0.1, 0.9)
-                current_queue_length = np.random.uniform(0, 100)
-                max_queue_length = 200.0
-                
-                # Submit bid
-                bid = scheduler.submit_bid(
-                    tenant_id, op_id, base_resources,
-                    current_input_rate, reference_input_rate,
-                    processing_complexity, current_queue_length,
-                    max_queue_length
-                )
-                bids.append(bid)
+        # Generate random (cpu, memory, network) requirements for all operators
+        requirements = RNG.uniform((1, 2, 0.5), (4, 8, 2), (n_ops, 3))
+        
+        # Generate random operational parameters
+        input_rates = RNG.uniform(100, 1000, n_ops)
+        complexities = RNG.uniform(0.1, 0.9, n_ops)
+        queue_lengths = RNG.uniform(0, 100, n_ops)
+        reference_input_rate = 500.0
+        max_queue_length = 200.0
+        
+        # Submit all bids from tenants in one batch
+        bids = scheduler.submit_bids_batch(
+            bid_tenants, bid_operators, requirements,
+            input_rates, reference_input_rate,
+            complexities, queue_lengths,
+            max_queue_length, resource_types=("cpu", "memory", "network")
+        )
         
         # Run auction
-        available_resources = {
-            "cpu": 32.0,
-            "memory": 128.0,
-            "network": 20.0
-        }
-        allocations = scheduler.run_auction_round(bids, available_resources)
+        allocations = scheduler.run_auction_round(bids, AVAILABLE_RESOURCES)
         
         # Print results
-        print(f"Number of bids: {len(bids)}")
-        print(f"Number of allocations: {len(allocations)}")
+        lines.append(f"Number of bids: {len(bids)}")
+        lines.append(f"Number of allocations: {len(allocations)}")
         
         for allocation in allocations:
-            print(f"  Tenant {allocation.tenant_id} allocated {allocation.resource_bundle} "
-                  f"for ${allocation.price_paid:.2f}")
+            lines.append(f"  Tenant {allocation.tenant_id} allocated {allocation.resource_bundle} "
+                         f"for ${allocation.price_paid:.2f}")
         
         # Print tenant balances
-        print("Tenant balances:")
-        for tenant_id in tenants.keys():
+        lines.append("Tenant balances:")
+        for tenant_id, _ in tenant_items:
             balance = scheduler.currency_system.get_balance(tenant_id)
-            print(f"  {tenant_id}: ${balance:.2f}")
+            lines.append(f"  {tenant_id}: ${balance:.2f}")
+        log.info("\n".join(lines))
     
     return scheduler
 
 
 def create_sample_visualizations():
-    """Create sample visualizations to demonstrate the plotting capabilities"""
+    """
+    Create sample visualizations to demonstrate the plotting capabilities
+    
+    Set STREAMBAZAAR_DEMO_PLOTS=0 to skip them.
+    """
+    if os.environ.get("STREAMBAZAAR_DEMO_PLOTS", "1") != "1":
+        log.info("Skipping sample visualizations (STREAMBAZAAR_DEMO_PLOTS)")
+        return
+    
     # Line plot example
-    x = np.linspace(0, 10, 100).tolist()
+    x = np.linspace(0, 10, 100)
     data = {
-        "Tenant A": (x, np.sin(x).tolist()),
-        "Tenant B": (x, np.cos(x).tolist()),
-        "Tenant C": (x, np.sin(np.array(x) + np.pi/4).tolist())
+        "Tenant A": (x, np.sin(x)),
+        "Tenant B": (x, np.cos(x)),
+        "Tenant C": (x, np.sin(x + np.pi/4))
     }
     
     fig1 = plotter.plot_line(
@@ -123,7 +181,7 @@ def create_sample_visualizations():
         "Utilization (%)",
         "utilization_over_time"
     )
-    print("Created line plot: utilization_over_time")
+    log.info("Created line plot: utilization_over_time")
     
     # Bar plot example
     data = {
@@ -141,12 +199,29 @@ def create_sample_visualizations():
         "Utilization (%)",
         "resource_utilization"
     )
-    print("Created bar plot: resource_utilization")
+    log.info("Created bar plot: resource_utilization")
     
-    # Box plot example
+    # Box plot example; the samples come from their own seeded generator, so the figure
+    # is fully determined by its parameters and is only redrawn when they change
+    distributions = {
+        "Tenant A": ((75, 5), (60, 7)),
+        "Tenant B": ((65, 6), (70, 4))
+    }
+    n_samples, seed = 50, 0
+    key = repr((sorted(distributions.items()), n_samples, seed)).encode()
+    plot_name = f"utilization_distribution_{hashlib.blake2b(key, digest_size=8).hexdigest()}"
+    # Reuse the figure only if the plotter already saved it in every configured format
+    output = load_config("config/visualization.yaml").get("output", {})
+    directory = output.get("directory", "output/")
+    formats = output.get("format", ["png"])
+    if all(os.path.exists(os.path.join(directory, f"{plot_name}.{fmt}")) for fmt in formats):
+        log.info(f"Reusing box plot: {plot_name}")
+        return
+    
+    rng = np.random.default_rng(seed)
     data = {
-        "Tenant A": [np.random.normal(75, 5, 50).tolist(), np.random.normal(60, 7, 50).tolist()],
-        "Tenant B": [np.random.normal(65, 6, 50).tolist(), np.random.normal(70, 4, 50).tolist()]
+        tenant: [rng.normal(mean, std, n_samples) for mean, std in params]
+        for tenant, params in distributions.items()
     }
     labels = ["CPU", "Memory"]
     
@@ -156,14 +231,14 @@ def create_sample_visualizations():
         "Resource Utilization Distribution",
         "Resource Type",
         "Utilization (%)",
-        "utilization_distribution"
+        plot_name
     )
-    print("Created box plot: utilization_distribution")
+    log.info(f"Created box plot: {plot_name}")
 
 
 def run_baseline_comparison_evaluation():
     """Run evaluation comparing StreamBazaar with all baseline schedulers"""
-    print("\n--- Running Baseline Comparison Evaluation ---")
+    log.info("\n--- Running Baseline Comparison Evaluation ---")
     
     # Load hyperparameters
     hyperparameters = load_config("config/hyperparameters.yaml")
@@ -180,58 +255,48 @@ def run_baseline_comparison_evaluation():
     }
     
     # Initialize tenants for all schedulers
-    tenants = {
-        "tenant_1": {"priority": 1.5, "operators": ["op_1", "op_2"]},
-        "tenant_2": {"priority": 1.0, "operators": ["op_3", "op_4", "op_5"]},
-        "tenant_3": {"priority": 0.8, "operators": ["op_6"]}
-    }
+    tenants = DEFAULT_TENANTS
     
-    for tenant_id, tenant_info in tenants.items():
+    tenant_items = list(tenants.items())
+    baseline_items = list(baselines.items())
+    for tenant_id, tenant_info in tenant_items:
         streambazaar.initialize_tenant(tenant_id, tenant_info["priority"])
-        for baseline in baselines.values():
+        for _, baseline in baseline_items:
             baseline.initialize_tenant(tenant_id, tenant_info["priority"])
     
     # Simulate several rounds for all schedulers
     for round_num in range(10):  # More rounds for better evaluation
-        print(f"  Evaluation Round {round_num + 1}/10")
+        log.info(f"  Evaluation Round {round_num + 1}/10")
         
-        # Generate tenant requirements for this round
+        # Generate tenant requirements for this round, one (cpu, memory, network) row per tenant
+        draws = RNG.uniform((2, 4, 1), (8, 16, 4), (len(tenants), 3))
         tenant_requirements = {}
-        for tenant_id, tenant_info in tenants.items():
+        for (tenant_id, tenant_info), (cpu, memory, network) in zip(tenant_items, draws.tolist()):
+            n_ops = len(tenant_info["operators"])
             requirements = {
-                "cpu": np.random.uniform(2, 8) * len(tenant_info["operators"]),
-                "memory": np.random.uniform(4, 16) * len(tenant_info["operators"]),
-                "network": np.random.uniform(1, 4) * len(tenant_info["operators"])
+                "cpu": cpu * n_ops,
+                "memory": memory * n_ops,
+                "network": network * n_ops
             }
             tenant_requirements[tenant_id] = requirements
         
-        # Available resources for this round
-        available_resources = {
-            "cpu": 32.0,
-            "memory": 128.0,
-            "network": 20.0
-        }
-        
         # Run StreamBazaar scheduling
-        streambazaar.run_auction_round([], available_resources)  # Empty bids for simplicity
+        streambazaar.run_auction_round([], AVAILABLE_RESOURCES)  # Empty bids for simplicity
         
         # Run baseline scheduling
-        for name, baseline in baselines.items():
-            baseline.run_scheduling_round(tenant_requirements, available_resources)
+        for name, baseline in baseline_items:
+            baseline.run_scheduling_round(tenant_requirements, AVAILABLE_RESOURCES)
     
     # Generate comparison plots
-    all_schedulers = {"StreamBazaar": streambazaar}
-    all_schedulers.update(baselines)
     plots = generate_evaluation_plots(streambazaar, baselines)
     
-    print(f"Generated {len(plots)} baseline comparison plots:")
-    for plot_name in plots:
-        print(f"  - {plot_name}")
+    log.info("\n".join([f"Generated {len(plots)} baseline comparison plots:"] +
+                       [f"  - {plot_name}" for plot_name in plots]))
 
 
 def run_application_comparison_evaluation():
     """Run evaluation comparing all schedulers across all applications"""
-    print("\n--- Running Application Comparison Evaluation ---")
+    log.info("\n--- Running Application Comparison Evaluation ---")
     
     # Load hyperparameters
     hyperparameters = load_config("config/hyperparameters.yaml")
@@ -249,62 +314,68 @@ def run_application_comparison_evaluation():
     applications = app_simulator.get_all_applications()
     app_names = list(applications.keys())
     
-    print(f"Evaluating {len(app_names)} applications: {', '.join(app_names)}")
+    log.info(f"Evaluating {len(app_names)} applications: {', '.join(app_names)}")
+    scheduler_list = list(schedulers.values())
+    
+    # Scheduling entry point of each scheduler, resolved once: StreamBazaar runs an
+    # auction round, the baselines a scheduling round over the tenant requirements
+    runners = {}
+    needs_requirements = {}
+    for name, scheduler in schedulers.items():
+        if hasattr(scheduler, 'run_auction_round'):
+            runners[name], needs_requirements[name] = scheduler.run_auction_round, False
+        elif hasattr(scheduler, 'run_scheduling_round'):
+            runners[name], needs_requirements[name] = scheduler.run_scheduling_round, True
     
     # Simulate workloads for each application
     for app_name in app_names:
-        print(f"  Evaluating {app_name}...")
+        log.info(f"  Evaluating {app_name}...")
         app = applications[app_name]
         
         # Initialize tenants for this application
+        op_ids = _operator_ids(app.num_operators)
         tenants = {
-            f"tenant_{i+1}": {"priority": app.priority.value, "operators": [f"op_{j+1}" for j in range(app.num_operators)]}
+            f"tenant_{i+1}": {"priority": app.priority.value, "operators": op_ids}
             for i in range(3)  # 3 tenants per application
         }
         
+        tenant_items = list(tenants.items())
+        
         # Initialize all schedulers with tenants
-        for scheduler in schedulers.values():
-            for tenant_id, tenant_info in tenants.items():
+        for scheduler in scheduler_list:
+            for tenant_id, tenant_info in tenant_items:
                 scheduler.initialize_tenant(tenant_id, tenant_info["priority"])
         
         # Simulate workload for multiple time steps
         for time_step in range(5):
             # Simulate tenant workloads for this application
             tenant_workloads = {}
-            for tenant_id in tenants.keys():
+            for tenant_id, _ in tenant_items:
                 workload = app_simulator.simulate_tenant_workload(app_name, tenant_id, time_step)
                 tenant_workloads[tenant_id] = workload
             
-            # Run scheduling for all schedulers
-            available_resources = {
-                "cpu": 32.0,
-                "memory": 128.0,
-                "network": 20.0
+            # For baselines, create simplified requirements once per time step
+            requirements = {
+                tenant_id: workload["resource_requirements"]
+                for tenant_id, workload in tenant_workloads.items()
             }
             
+            # Run scheduling for all schedulers
             # For simplicity, we'll just run the scheduling without detailed resource allocation
-            for scheduler in schedulers.values():
-                if hasattr(scheduler, 'run_auction_round'):
-                    scheduler.run_auction_round([], available_resources)
-                elif hasattr(scheduler, 'run_scheduling_round'):
-                    # For baselines, create simplified requirements
-                    requirements = {
-                        tenant_id: workload["resource_requirements"]
-                        for tenant_id, workload in tenant_workloads.items()
-                    }
-                    scheduler.run_scheduling_round(requirements, available_resources)
+            for name, runner in runners.items():
+                runner(requirements if needs_requirements[name] else [], AVAILABLE_RESOURCES)
     
     # Generate application comparison plots
     plots = generate_application_comparison_plots(app_names, schedulers)
     
-    print(f"Generated {len(plots)} application comparison plots:")
-    for plot_name in plots:
-        print(f"  - {plot_name}")
+    log.info("\n".join([f"Generated {len(plots)} application comparison plots:"] +
+                       [f"  - {plot_name}" for plot_name in plots]))
 
 
 if __name__ == "__main__":
-    print("StreamBazaar Demo")
-    print("==================")
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    
+    log.info("StreamBazaar Demo\n==================")
     
     # Run simulation
     scheduler = simulate_streaming_cluster()
@@ -319,7 +390,7 @@ if __name__ == "__main__":
     run_application_comparison_evaluation()
     
     # Run scalability evaluation
-    print("\n--- Running Scalability Evaluation ---")
+    log.info("\n--- Running Scalability Evaluation ---")
     run_scalability_evaluation()
     
-    print("\nDemo completed. Check the 'output' directory for generated plots and 'evaluation_results' for CSV files and scalability plots.")
\ No newline at end of file
+    log.info("\nDemo completed. Check the 'output' directory for generated plots and 'evaluation_results' for CSV files and scalability plots.")
\ No newline at end of file
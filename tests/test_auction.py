@@ -0,0 +1,242 @@
+"""
+Tests for greedy winner determination in the StreamBazaar auction mechanism
+"""
+
+import random
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pytest
+
+import core.auction
+from core.auction import RESOURCE_DTYPE, AuctionMechanism, Bid, BidBatch
+from core.scheduler import StreamBazaarScheduler
+
+RESOURCE_TYPES = ("cpu", "memory", "network")
+
+
+def efficiency(bid: Bid) -> float:
+    """Valuation per unit of requested resources"""
+    if bid.total_resources == 0:
+        return 0.0
+    return bid.valuation / bid.total_resources
+
+
+def reference_greedy(bids: List[Bid], available_resources: Dict[str, float],
+                     tenant_balances: Dict[str, float],
+                     key: Optional[Callable[[Bid], float]] = None) -> Tuple[List[Bid], Dict[str, float]]:
+    """
+    Float64 greedy over the bid dicts, in stable order of decreasing key
+    
+    Returns:
+        Tuple[List[Bid], Dict[str, float]]: Winners in the order they were accepted and
+        the tenant balances after payment
+    """
+    remaining = dict(available_resources)
+    balances = dict(tenant_balances)
+    winners = []
+    for bid in sorted(bids, key=key or efficiency, reverse=True):
+        if balances.get(bid.tenant_id, 0.0) < bid.valuation:
+            continue
+        if all(remaining.get(k, 0.0) >= amount for k, amount in bid.resource_bundle.items()):
+            for k, amount in bid.resource_bundle.items():
+                remaining[k] -= amount
+            balances[bid.tenant_id] -= bid.valuation
+            winners.append(bid)
+    return winners, balances
+
+
+def make_bids(rng: random.Random, n_bids: int, n_tenants: int = 10) -> List[Bid]:
+    """Random bids with amounts on a 0.25 grid, which float32 represents exactly"""
+    return [
+        Bid(tenant_id=f"tenant_{rng.randrange(n_tenants)}",
+            resource_bundle={k: rng.randint(1, 16) * 0.25 for k in RESOURCE_TYPES},
+            valuation=rng.randint(1, 40) * 0.5,  # coarse, so efficiencies tie
+            timestamp=float(i))
+        for i in range(n_bids)
+    ]
+
+
+def run_auction(auction: AuctionMechanism, bids: List[Bid], available_resources: Dict[str, float],
+                tenant_balances: Dict[str, float]) -> Tuple[List[float], Dict[str, float]]:
+    """Timestamps of the winning bids in acceptance order and the balances after payment"""
+    balances = dict(tenant_balances)
+    allocations, rejected = auction.determine_winners(bids, dict(available_resources), balances)
+    assert len(allocations) + len(rejected) == len(bids)
+    return [a.timestamp for a in allocations], balances
+
+
+def record_kernel_calls(monkeypatch) -> List[int]:
+    """Record the number of bids passed to each call of the greedy kernel"""
+    calls = []
+    kernel = core.auction._greedy_select
+    
+    def recording_kernel(R, v, tenant_idx, remaining, balances, order):
+        calls.append(len(order))
+        return kernel(R, v, tenant_idx, remaining, balances, order)
+    
+    monkeypatch.setattr(core.auction, "_greedy_select", recording_kernel)
+    return calls
+
+
+def assert_matches_reference(auction: AuctionMechanism, bids: List[Bid],
+                             available_resources: Dict[str, float], tenant_balances: Dict[str, float]):
+    """Check winners, their acceptance order and the balances against reference_greedy"""
+    winners, expected_balances = reference_greedy(bids, available_resources, tenant_balances)
+    timestamps, balances = run_auction(auction, bids, available_resources, tenant_balances)
+    assert timestamps == [bid.timestamp for bid in winners]
+    assert balances == pytest.approx(expected_balances)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_dict_path_matches_reference(seed):
+    rng = random.Random(seed)
+    bids = make_bids(rng, rng.randint(1, 200))
+    available = {k: rng.uniform(0.0, 100.0) for k in RESOURCE_TYPES}
+    balances = {f"tenant_{t}": rng.uniform(0.0, 100.0) for t in range(10)}
+    assert_matches_reference(AuctionMechanism({}), bids, available, balances)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_partition_path_matches_reference(seed, monkeypatch):
+    rng = random.Random(seed)
+    n_bids = rng.randint(200, 900)
+    bids = make_bids(rng, n_bids)
+    # Roughly 5% of the bids fit, so only a head of the ranking is sorted up front
+    available = {k: n_bids * 0.05 * 2.125 for k in RESOURCE_TYPES}
+    balances = {f"tenant_{t}": rng.uniform(20.0, 200.0) for t in range(10)}
+    calls = record_kernel_calls(monkeypatch)
+    
+    assert_matches_reference(AuctionMechanism({'packed_min_bids': 0}), bids, available, balances)
+    assert calls[0] < n_bids
+
+
+def test_partition_tail_bids_still_win(monkeypatch):
+    # Large efficient bids exhaust memory in the head; small inefficient cpu-only bids fit afterwards
+    bids = [Bid(tenant_id=f"tenant_{i % 10}", resource_bundle={k: 4.0 for k in RESOURCE_TYPES},
+                valuation=12.0 + (i % 7), timestamp=float(i)) for i in range(290)]
+    bids += [Bid(tenant_id="tenant_small", resource_bundle={"cpu": 0.25},
+                 valuation=0.01, timestamp=float(290 + i)) for i in range(10)]
+    available = {"cpu": 41.0, "memory": 40.0, "network": 40.0}
+    balances = {f"tenant_{t}": 1000.0 for t in range(10)}
+    balances["tenant_small"] = 1.0
+    calls = record_kernel_calls(monkeypatch)
+    
+    assert_matches_reference(AuctionMechanism({'packed_min_bids': 0}), bids, available, balances)
+    assert len(calls) == 2 and calls[0] < len(bids)
+    winners, _ = reference_greedy(bids, available, balances)
+    assert sum(bid.tenant_id == "tenant_small" for bid in winners) == 4
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_full_sort_path_matches_reference(seed, monkeypatch):
+    rng = random.Random(seed)
+    n_bids = rng.randint(200, 900)
+    bids = make_bids(rng, n_bids)
+    # Most bids fit, so the whole ranking is sorted at once
+    available = {k: n_bids * 2.0 for k in RESOURCE_TYPES}
+    balances = {f"tenant_{t}": 1e6 for t in range(10)}
+    calls = record_kernel_calls(monkeypatch)
+    
+    assert_matches_reference(AuctionMechanism({'packed_min_bids': 0}), bids, available, balances)
+    assert calls == [n_bids]
+
+
+def test_float32_boundary():
+    just_over = 1.0 + 1e-9  # rounds to 1.0 in float32
+    one_ulp_over = float(np.nextafter(RESOURCE_DTYPE(1.0), RESOURCE_DTYPE(2.0)))
+    assert RESOURCE_DTYPE(just_over) == 1.0
+    available = {"cpu": 1.0}
+    balances = {"tenant_0": 10.0}
+    
+    def winners(auction: AuctionMechanism, amount: float) -> List[float]:
+        bids = [Bid(tenant_id="tenant_0", resource_bundle={"cpu": amount}, valuation=1.0, timestamp=0.0)]
+        return run_auction(auction, bids, available, balances)[0]
+    
+    packed = AuctionMechanism({'packed_min_bids': 0})
+    unpacked = AuctionMechanism({})
+    # An exact fit wins on both paths
+    assert winners(packed, 1.0) == winners(unpacked, 1.0) == [0.0]
+    # Within float32 resolution the packed path accepts what the float64 greedy rejects
+    assert reference_greedy([Bid("tenant_0", {"cpu": just_over}, 1.0, 0.0)], available, balances)[0] == []
+    assert winners(unpacked, just_over) == []
+    assert winners(packed, just_over) == [0.0]
+    # One float32 step above the capacity is rejected on both paths
+    assert winners(packed, one_ulp_over) == winners(unpacked, one_ulp_over) == []
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_wide_auction_matches_reference_by_default(seed):
+    rng = random.Random(seed)
+    n_bids = rng.randint(1000, 3000)
+    bids = make_bids(rng, n_bids, n_tenants=50)
+    available = {k: n_bids * rng.uniform(0.05, 1.0) for k in RESOURCE_TYPES}
+    balances = {f"tenant_{t}": rng.uniform(20.0, 200.0) for t in range(50)}
+    assert_matches_reference(AuctionMechanism({}), bids, available, balances)
+
+
+def quantized_efficiency(bids: List[Bid], n_buckets: int) -> Callable[[Bid], float]:
+    """Sort key ranking bids by efficiency quantized into n_buckets levels"""
+    scale = n_buckets / max(efficiency(bid) for bid in bids)
+    return lambda bid: min(int(efficiency(bid) * scale), n_buckets - 1)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_bucket_path_matches_quantized_reference(seed):
+    rng = random.Random(seed)
+    n_bids = rng.randint(1000, 3000)
+    bids = make_bids(rng, n_bids, n_tenants=50)
+    available = {k: n_bids * rng.uniform(0.05, 1.0) for k in RESOURCE_TYPES}
+    balances = {f"tenant_{t}": rng.uniform(20.0, 200.0) for t in range(50)}
+    auction = AuctionMechanism({'efficiency_buckets': 64, 'bucket_sort_min_bids': 1000})
+    
+    winners, expected_balances = reference_greedy(bids, available, balances,
+                                                  key=quantized_efficiency(bids, 64))
+    timestamps, balances_after = run_auction(auction, bids, available, balances)
+    assert timestamps == [bid.timestamp for bid in winners]
+    assert balances_after == pytest.approx(expected_balances)
+    
+    # Whatever the ranking, winners fit the capacity and the tenants' budgets
+    for k in RESOURCE_TYPES:
+        assert sum(bid.resource_bundle[k] for bid in winners) <= available[k]
+    assert all(balance >= 0.0 for balance in balances_after.values())
+
+
+def test_bucket_path_ranks_ties_by_submission_order():
+    # The two cpu bids share an efficiency bucket and only one fits; the rest cannot fit at all
+    bids = [Bid(tenant_id="tenant_0", resource_bundle={"cpu": 1.0}, valuation=1.0, timestamp=0.0),
+            Bid(tenant_id="tenant_0", resource_bundle={"cpu": 1.0}, valuation=1.001, timestamp=1.0)]
+    bids += [Bid(tenant_id="tenant_0", resource_bundle={"gpu": 1.0}, valuation=4.0, timestamp=float(i))
+             for i in range(2, 1000)]
+    available = {"cpu": 1.0}
+    balances = {"tenant_0": 10.0}
+    
+    exact, _ = reference_greedy(bids, available, balances)
+    assert [bid.timestamp for bid in exact] == [1.0]
+    assert run_auction(AuctionMechanism({'bucket_sort_min_bids': 1000}), bids, available, balances)[0] == [0.0]
+    # Bucket-sorting is opt-in; by default wide auctions rank exactly
+    assert run_auction(AuctionMechanism({}), bids, available, balances)[0] == [1.0]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_and_list_rounds_allocate_the_same(seed):
+    rng = random.Random(seed)
+    # Bids request random subsets of the resources, some with an explicit zero
+    bids = [
+        Bid(tenant_id=f"tenant_{rng.randrange(10)}",
+            resource_bundle={k: rng.randint(0, 16) * 0.25 for k in RESOURCE_TYPES if rng.random() < 0.7},
+            valuation=rng.randint(1, 40) * 0.5, timestamp=float(i))
+        for i in range(rng.randint(1, 300))
+    ]
+    available = {k: rng.uniform(10.0, 100.0) for k in RESOURCE_TYPES}
+    weights = [rng.uniform(0.05, 0.5) for _ in range(10)]
+    
+    rounds = []
+    for batch in (False, True):
+        scheduler = StreamBazaarScheduler({})
+        for t, weight in enumerate(weights):
+            scheduler.initialize_tenant(f"tenant_{t}", weight)
+        allocations = scheduler.run_auction_round(BidBatch.from_bids(bids) if batch else bids, dict(available))
+        rounds.append(([(a.tenant_id, a.resource_bundle, a.price_paid, a.timestamp) for a in allocations],
+                       scheduler.currency_system.get_balances_view()))
+    assert rounds[0] == rounds[1]
@@ -0,0 +1,35 @@
+"""
+Tests for the shared allocation round of the baseline schedulers
+"""
+
+import random
+
+import pytest
+
+from core.baselines import CAPSysBaseline, DS2Baseline, FlinkDefaultBaseline, TALOSBaseline
+
+
+@pytest.mark.parametrize("cls", [FlinkDefaultBaseline, DS2Baseline, CAPSysBaseline, TALOSBaseline])
+@pytest.mark.parametrize("seed", range(5))
+def test_loop_and_matrix_paths_agree(cls, seed):
+    rng = random.Random(seed)
+    tenant_ids = [f"tenant_{t}" for t in range(rng.randint(1, 12))]
+    loop, matrix = cls({}), cls({})
+    matrix.matrix_min_resources = 0
+    for tenant_id in tenant_ids:
+        weight = rng.uniform(0.5, 2.0)
+        loop.initialize_tenant(tenant_id, weight)
+        matrix.initialize_tenant(tenant_id, weight)
+    
+    for _ in range(10):
+        keys = ["cpu", "memory", "network"] + (["gpu"] if rng.random() < 0.2 else [])
+        requirements = {t: {k: rng.uniform(0.0, 20.0) for k in keys if rng.random() < 0.9}
+                        for t in tenant_ids if rng.random() < 0.9}
+        available = {"cpu": 32.0, "memory": rng.uniform(0.0, 128.0), "network": 20.0}
+        expected = loop.run_scheduling_round(requirements, available)
+        allocations = matrix.run_scheduling_round(requirements, available)
+        assert list(allocations) == list(expected)
+        for tenant_id, allocation in allocations.items():
+            assert allocation == pytest.approx(expected[tenant_id])
+    
+    assert matrix.get_evaluation_metrics() == pytest.approx(loop.get_evaluation_metrics())
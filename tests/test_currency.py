@@ -0,0 +1,164 @@
+"""
+Tests for lazy decay and balance history of the currency system
+"""
+
+import random
+from typing import Dict
+
+import pytest
+
+from core.currency import CurrencySystem
+
+
+class EagerCurrency:
+    """Reference ledger decaying every balance at each tick, as the dict implementation did"""
+    
+    def __init__(self, decay_rate: float):
+        self.decay_rate = decay_rate
+        self.balances: Dict[str, float] = {}
+    
+    def apply_decay(self):
+        for tenant_id in self.balances:
+            self.balances[tenant_id] *= (1.0 - self.decay_rate)
+    
+    def deduct(self, tenant_id: str, amount: float) -> bool:
+        if self.balances.get(tenant_id, 0.0) >= amount:
+            self.balances[tenant_id] -= amount
+            return True
+        return False
+
+
+def make_currency(**currency) -> CurrencySystem:
+    return CurrencySystem({'currency': {'decay_rate': 0.1, 'base_allocation': 100.0, **currency}})
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_lazy_decay_matches_eager(seed):
+    rng = random.Random(seed)
+    currency, eager = make_currency(), EagerCurrency(0.1)
+    tenant_ids = [f"tenant_{t}" for t in range(8)]
+    for _ in range(300):
+        tenant_id = rng.choice(tenant_ids)
+        op = rng.random()
+        if op < 0.1:
+            weight = rng.uniform(0.5, 2.0)
+            currency.initialize_tenant(tenant_id, weight)
+            eager.balances[tenant_id] = 100.0 * weight
+        elif op < 0.3:
+            currency.allocate_currency(tenant_id, 1.0, 0.5, 1.0)
+            eager.balances[tenant_id] = eager.balances.get(tenant_id, 0.0) + 100.0 * 1.25
+        elif op < 0.5:
+            amount = rng.uniform(0.0, 80.0)
+            assert currency.deduct_balance(tenant_id, amount) == eager.deduct(tenant_id, amount)
+        elif op < 0.6:
+            pairs = [(rng.choice(tenant_ids), rng.uniform(0.0, 50.0)) for _ in range(rng.randint(0, 4))]
+            assert currency.deduct_many(pairs) == [eager.deduct(t, amount) for t, amount in pairs]
+        else:
+            # Several ticks may pass without any tenant being read or modified
+            currency.apply_decay()
+            eager.apply_decay()
+        if rng.random() < 0.2:
+            assert currency.get_balances_view() == pytest.approx(eager.balances)
+    assert currency.get_balances_view() == pytest.approx(eager.balances)
+    for tenant_id in tenant_ids:
+        assert currency.get_balance(tenant_id) == pytest.approx(eager.balances.get(tenant_id, 0.0))
+
+
+def test_deduct_many_matches_sequential_deductions():
+    many, single = make_currency(), make_currency()
+    for currency in (many, single):
+        currency.initialize_tenant("tenant_0")
+        currency.initialize_tenant("tenant_1", 0.5)
+        currency.apply_decay()
+    # The same tenant may deduct twice; unknown tenants and overdrafts fail
+    pairs = [("tenant_0", 60.0), ("tenant_0", 40.0), ("tenant_1", 40.0), ("tenant_2", 1.0), ("tenant_1", 10.0)]
+    assert many.deduct_many(pairs) == [single.deduct_balance(t, amount) for t, amount in pairs] \
+        == [True, False, True, False, False]
+    assert many.get_balances_view() == pytest.approx(single.get_balances_view())
+    assert many.get_balances_view() == pytest.approx({"tenant_0": 30.0, "tenant_1": 5.0})
+
+
+def test_balances_view_is_a_snapshot():
+    currency = make_currency()
+    currency.initialize_tenant("tenant_0")
+    view = currency.get_balances_view()
+    currency.apply_decay()
+    assert view == {"tenant_0": 100.0}
+    assert currency.get_balances_view() == pytest.approx({"tenant_0": 90.0})
+
+
+def test_balances_is_a_live_read_only_mapping():
+    currency = make_currency()
+    balances = currency.balances
+    assert balances is currency.balances
+    currency.initialize_tenant("tenant_0")
+    currency.apply_decay()
+    currency.allocate_currency("tenant_1", 1.0, 0.0, 0.0)
+    # Lookups see decay and new tenants without the mapping being rebuilt
+    assert dict(balances) == pytest.approx({"tenant_0": 90.0, "tenant_1": 100.0})
+    assert len(balances) == 2 and "tenant_1" in balances
+    assert balances.get("tenant_2", 0.0) == 0.0
+    with pytest.raises(KeyError):
+        balances["tenant_2"]
+    with pytest.raises(TypeError):
+        balances["tenant_0"] = 0.0
+
+
+def test_history_records_initial_pre_decay_and_current_balances():
+    currency = make_currency(record_history=True)
+    currency.initialize_tenant("tenant_0")
+    # Until a tick closes, the history is just the current balance
+    assert currency.get_history("tenant_0") == [100.0]
+    currency.deduct_balance("tenant_0", 20.0)
+    currency.apply_decay()
+    # Starting balance, the balance the tick closed with before decaying, then the current one
+    assert currency.get_history("tenant_0") == pytest.approx([100.0, 80.0, 72.0])
+    currency.apply_decay()
+    assert currency.get_history("tenant_0") == pytest.approx([100.0, 80.0, 72.0, 64.8])
+    assert currency.get_history("tenant_unknown") == []
+
+
+def test_history_disabled_keeps_current_balance_only():
+    currency = make_currency()
+    currency.initialize_tenant("tenant_0")
+    currency.apply_decay()
+    assert currency.get_history("tenant_0") == pytest.approx([90.0])
+
+
+def test_history_ring_wraps_and_truncates():
+    currency = make_currency(record_history=True, history_length=4)
+    currency.initialize_tenant("tenant_0")
+    expected = []
+    balance = 100.0
+    for tick in range(10):
+        if tick == 3:
+            # A tenant joining late starts its history at its first tick
+            currency.initialize_tenant("tenant_1")
+        expected.append(balance)
+        currency.apply_decay()
+        balance *= 0.9
+    # Only the last history_length ticks are kept; the starting balance went with the first
+    history = currency.get_history("tenant_0")
+    assert history == pytest.approx(expected[-4:] + [balance], rel=1e-6)
+    assert len(currency.get_history("tenant_1")) == 4 + 1
+    
+    short = make_currency(record_history=True, history_length=4)
+    short.initialize_tenant("tenant_0")
+    for _ in range(3):
+        short.apply_decay()
+    assert short.get_history("tenant_0") == pytest.approx([100.0, 100.0, 90.0, 81.0, 72.9], rel=1e-6)
+    short.apply_decay()
+    # The fourth tick fills the ring, and the starting balance is still within it
+    assert short.get_history("tenant_0") == pytest.approx([100.0, 100.0, 90.0, 81.0, 72.9, 65.61], rel=1e-6)
+    short.apply_decay()
+    assert short.get_history("tenant_0") == pytest.approx([90.0, 81.0, 72.9, 65.61, 59.049], rel=1e-6)
+
+
+def test_reinitializing_restarts_history():
+    currency = make_currency(record_history=True)
+    currency.initialize_tenant("tenant_0")
+    currency.apply_decay()
+    currency.initialize_tenant("tenant_0", 2.0)
+    assert currency.get_history("tenant_0") == [200.0]
+    currency.apply_decay()
+    assert currency.get_history("tenant_0") == pytest.approx([200.0, 200.0, 180.0])
@@ -0,0 +1,156 @@
+"""
+Tests for the streaming statistics of the metrics tracker
+"""
+
+import random
+from typing import List
+
+import numpy as np
+import pytest
+
+from core.metrics import MetricsTracker, Priority, _Window
+
+
+def mean(samples: List[float]) -> float:
+    return sum(samples) / len(samples) if samples else 0.0
+
+
+@pytest.mark.parametrize("capacity", [1, 3, 8])
+def test_window_matches_naive_list(capacity):
+    rng = random.Random(capacity)
+    window, samples = _Window(capacity), []
+    # Several laps, so the ring wraps and its running sum is resynced more than once
+    for _ in range(5 * capacity + 2):
+        value = rng.uniform(-10.0, 10.0)
+        window.push(value)
+        samples.append(value)
+        recent = samples[-capacity:]
+        assert window.fill == len(recent)
+        assert window.total == pytest.approx(sum(recent))
+        assert window.view().tolist() == recent
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_windowed_metrics_match_naive_list(seed):
+    rng = random.Random(seed)
+    window = rng.randint(1, 10)
+    tracker = MetricsTracker(metrics_window=window)
+    utilizations, throughputs, impacts = [], [], []
+    for _ in range(rng.randint(0, 40)):
+        if rng.random() < 0.5:
+            sample = {k: rng.random() for k in ("cpu", "memory", "network")}
+            tracker.record_resource_utilization(sample)
+            utilizations.append(sum(sample.values()) / 3)
+        if rng.random() < 0.5:
+            throughputs.append(rng.random())
+            tracker.record_throughput(throughputs[-1])
+        if rng.random() < 0.3:
+            impacts.append(rng.random())
+            tracker.record_migration_impact(impacts[-1])
+    
+    assert tracker.calculate_resource_utilization_efficiency() == pytest.approx(mean(utilizations[-window:]))
+    assert tracker.calculate_normalized_throughput() == pytest.approx(mean(throughputs[-window:]))
+    assert tracker.calculate_migration_impact_score() == pytest.approx(mean(impacts[-window:]))
+    assert tracker.throughput_history.tolist() == pytest.approx(throughputs[-window:])
+    assert tracker.migration_impact_history.tolist() == pytest.approx(impacts[-window:])
+    assert tracker.window_fill == {
+        "utilization": min(len(utilizations), window),
+        "throughput": min(len(throughputs), window),
+        "migration_impact": min(len(impacts), window)
+    }
+
+
+def test_unwindowed_metrics_average_everything():
+    tracker = MetricsTracker()
+    for throughput in (0.2, 0.4, 0.9):
+        tracker.record_throughput(throughput)
+    assert tracker.calculate_normalized_throughput() == pytest.approx(0.5)
+    assert tracker.window_fill == {}
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_record_latencies_matches_record_latency(seed):
+    rng = random.Random(seed)
+    single, batch = MetricsTracker(), MetricsTracker()
+    priorities = ["low", "medium", "high", "unknown", Priority.HIGH, Priority.LOW]
+    for _ in range(rng.randint(1, 6)):
+        # Tenants repeat within and across calls, and may change priority
+        n = rng.randint(1, 12)
+        tenant_ids = [f"tenant_{rng.randrange(8)}" for _ in range(n)]
+        latencies = [rng.uniform(50.0, 150.0) for _ in range(n)]
+        if rng.random() < 0.3:
+            prios = rng.choice(priorities)
+            batch.record_latencies(tenant_ids, latencies, prios)
+            prios = [prios] * n
+        else:
+            prios = [rng.choice(priorities) for _ in range(n)]
+            batch.record_latencies(tenant_ids, np.asarray(latencies), prios)
+        for tenant_id, latency, priority in zip(tenant_ids, latencies, prios):
+            single.record_latency(tenant_id, latency, priority)
+        assert batch.calculate_tail_latency_violation_rate() == single.calculate_tail_latency_violation_rate()
+        assert (batch._high_total, batch._high_violations) == (single._high_total, single._high_violations)
+
+
+def test_latest_latency_replaces_previous():
+    tracker = MetricsTracker()
+    tracker.record_latencies(["tenant_0", "tenant_1"], [150.0, 50.0], "high")
+    assert tracker.calculate_tail_latency_violation_rate() == 50.0
+    tracker.record_latency("tenant_0", 80.0, "high")
+    assert tracker.calculate_tail_latency_violation_rate() == 0.0
+    # A tenant that is no longer high-priority drops out of the rate
+    tracker.record_latencies(["tenant_1", "tenant_0"], [500.0, 120.0], ["low", "high"])
+    assert tracker.calculate_tail_latency_violation_rate() == 100.0
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda sla: sla.__setitem__("high_priority_latency", 500.0),
+    lambda sla: sla.update(high_priority_latency=500.0),
+    lambda sla: sla.__ior__({"high_priority_latency": 500.0}),
+    lambda sla: (sla.pop("high_priority_latency"), sla.setdefault("high_priority_latency", 500.0)),
+    lambda sla: (sla.clear(), sla.setdefault("high_priority_latency", 500.0)),
+    lambda sla: (sla.__delitem__("high_priority_latency"), sla.__setitem__("high_priority_latency", 500.0)),
+])
+def test_sla_mutations_reach_violation_rate(mutate):
+    tracker = MetricsTracker()
+    tracker.record_latency("tenant_0", 150.0, "high")
+    assert tracker.calculate_tail_latency_violation_rate() == 100.0
+    mutate(tracker.sla_requirements)
+    assert tracker.calculate_tail_latency_violation_rate() == 0.0
+
+
+def test_sla_removal_restores_default_threshold():
+    tracker = MetricsTracker()
+    tracker.sla_requirements["high_priority_latency"] = 500.0
+    tracker.record_latency("tenant_0", 150.0, "high")
+    assert tracker.calculate_tail_latency_violation_rate() == 0.0
+    tracker.sla_requirements.pop("high_priority_latency")
+    assert tracker.calculate_tail_latency_violation_rate() == 100.0
+
+
+def test_history_accessors_with_keep_history():
+    tracker = MetricsTracker(keep_history=True)
+    tracker.record_resource_utilization({"cpu": 0.5, "memory": 0.25})
+    tracker.record_auction_results([1.0, 2.0], [1, 0])
+    tracker.record_auction_results(np.array([3.0]), np.array([1]))
+    tracker.record_throughput(0.5)
+    tracker.record_migration_impact(0.25)
+    tracker.record_latency("tenant_0", 120.0, "high")
+    
+    assert tracker.resource_utilization_history.tolist() == [[0.5, 0.25, 0.0]]
+    assert [v.tolist() for v in tracker.valuations_history] == [[1.0, 2.0], [3.0]]
+    assert [x.tolist() for x in tracker.allocations_history] == [[1.0, 0.0], [1.0]]
+    assert tracker.throughput_history.tolist() == [0.5]
+    assert tracker.migration_impact_history.tolist() == [0.25]
+    assert tracker.latency_history == [{"tenant_0": {"latency": 120.0, "priority": "high"}}]
+    with pytest.raises(ValueError):
+        tracker.throughput_history[0] = 1.0
+    with pytest.raises(ValueError):
+        tracker.valuations_history[0][0] = 1.0
+
+
+@pytest.mark.parametrize("name", ["resource_utilization_history", "valuations_history", "allocations_history",
+                                  "throughput_history", "migration_impact_history"])
+def test_history_accessors_need_keep_history(name):
+    tracker = MetricsTracker()
+    with pytest.raises(RuntimeError, match="keep_history"):
+        getattr(tracker, name)